@@ -0,0 +1,154 @@
+"""Generate synthetic exrun courses for benchmarking.
+
+Courses follow the layout of the ``sample_*_course`` directories: an
+``exrun.toml`` next to an ``exercises/`` tree of numbered exercise
+directories, each with ``problem.md``, ``src/`` and ``tests/``.
+
+    python -m benchmarks.generate /tmp/course --exercises 500 --depth 2 \\
+        --mix python=3,typescript=1,react=1,html_css=1
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+
+# File templates per language: (src name, src body, test name, test body)
+_TEMPLATES: dict[str, tuple[str, str, str, str]] = {
+    "python": (
+        "main.py",
+        "def solve(n):\n    return n * 2\n",
+        "test_main.py",
+        "from main import solve\n\n\ndef test_solve():\n    assert solve(2) == 4\n",
+    ),
+    "pytorch": (
+        "main.py",
+        "import torch\n\n\ndef solve(n):\n    return torch.tensor(n) * 2\n",
+        "test_main.py",
+        "from main import solve\n\n\ndef test_solve():\n    assert solve(2).item() == 4\n",
+    ),
+    "javascript": (
+        "main.js",
+        "export function solve(n) {\n  return n * 2;\n}\n",
+        "main.test.js",
+        "import { solve } from '../src/main';\n\n"
+        "test('solve', () => {\n  expect(solve(2)).toBe(4);\n});\n",
+    ),
+    "typescript": (
+        "main.ts",
+        "export function solve(n: number): number {\n  return n * 2;\n}\n",
+        "main.test.ts",
+        "import { describe, it, expect } from 'vitest';\n"
+        "import { solve } from '../src/main';\n\n"
+        "describe('solve', () => {\n  it('doubles', () => {\n"
+        "    expect(solve(2)).toBe(4);\n  });\n});\n",
+    ),
+    "react": (
+        "Component.tsx",
+        "import React from 'react';\n\n"
+        "export function Component() {\n  return <div className=\"greeting\">Hi</div>;\n}\n",
+        "Component.test.tsx",
+        "import { render, screen } from '@testing-library/react';\n"
+        "import { Component } from '../src/Component';\n\n"
+        "it('renders', () => {\n  render(<Component />);\n"
+        "  expect(screen.getByText('Hi')).toBeDefined();\n});\n",
+    ),
+    "html_css": (
+        "index.html",
+        "<!DOCTYPE html>\n<html>\n<head><link rel=\"stylesheet\" href=\"style.css\"></head>\n"
+        "<body><h1>Hello</h1></body>\n</html>\n",
+        "test.spec.js",
+        "const { test, expect } = require('@playwright/test');\n\n"
+        "test('has heading', async ({ page }) => {\n"
+        "  await page.goto('file://' + __dirname + '/../src/index.html');\n"
+        "  await expect(page.locator('h1')).toHaveText('Hello');\n});\n",
+    ),
+}
+
+LANGUAGES = tuple(_TEMPLATES)
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """Parse ``python=3,react=1`` into language weights."""
+    mix: dict[str, int] = {}
+    for part in spec.split(","):
+        language, _, weight = part.partition("=")
+        if language not in _TEMPLATES:
+            raise ValueError(f"Unknown language: {language}")
+        mix[language] = int(weight or 1)
+    return mix
+
+
+def generate_course(
+    dest: Path,
+    exercises: int,
+    depth: int = 1,
+    mix: dict[str, int] | None = None,
+    seed: int = 0,
+) -> Path:
+    """Write a synthetic course to ``dest`` and return its exercises directory.
+
+    Exercises are spread over ``depth`` levels of numbered section
+    directories (``01_section/02_section/0003_python_3``). The course language
+    is the most heavily weighted one in ``mix``; the others are picked per
+    exercise, so ``detect_language`` has to inspect each exercise's files.
+    """
+    mix = mix or {"python": 1}
+    rng = random.Random(seed)
+    languages = list(mix)
+    weights = [mix[language] for language in languages]
+    course_language = max(mix, key=lambda language: mix[language])
+
+    dest.mkdir(parents=True, exist_ok=True)
+    (dest / "exrun.toml").write_text(
+        "[course]\n"
+        f'name = "Synthetic {exercises}"\n'
+        'version = "1.0.0"\n'
+        f'language = "{course_language}"\n'
+        'exercises_path = "./exercises"\n'
+    )
+
+    exercises_path = dest / "exercises"
+    # Roughly equal fan-out at each level
+    fan_out = max(2, round(exercises ** (1 / depth))) if depth > 1 else exercises
+    for index in range(exercises):
+        parts = []
+        remainder = index
+        for _ in range(depth - 1):
+            parts.append(remainder % fan_out)
+            remainder //= fan_out
+        sections = [f"{n + 1:02d}_section" for n in reversed(parts)]
+        language = rng.choices(languages, weights)[0]
+        # Exercise names must be unique course-wide for ProgressDB
+        exercise_dir = exercises_path.joinpath(
+            *sections, f"{index + 1:04d}_{language}_{index + 1}"
+        )
+
+        src_name, src_body, test_name, test_body = _TEMPLATES[language]
+        (exercise_dir / "src").mkdir(parents=True)
+        (exercise_dir / "tests").mkdir()
+        (exercise_dir / "problem.md").write_text(
+            f"# Exercise {index + 1}\n\nDouble the input.\n"
+        )
+        (exercise_dir / "src" / src_name).write_text(src_body)
+        (exercise_dir / "tests" / test_name).write_text(test_body)
+
+    return exercises_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dest", type=Path)
+    parser.add_argument("--exercises", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--mix", default="python=1", help="Language weights, e.g. python=3,react=1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_course(args.dest, args.exercises, args.depth, parse_mix(args.mix), args.seed)
+    print(f"Wrote {args.exercises} exercises to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Synthetic test-runner output for benchmarking the adapters' parsers."""
+
+from __future__ import annotations
+
+
+def pytest_output(tests: int, failures: int) -> str:
+    lines = ["============================= test session starts =============================="]
+    lines += [
+        f"tests/test_main.py::test_case_{i} {'FAILED' if i < failures else 'PASSED'}"
+        f" [{(i + 1) * 100 // tests:3d}%]"
+        for i in range(tests)
+    ]
+    lines.append("=================================== FAILURES ===================================")
+    for i in range(failures):
+        lines += [
+            f"________________________________ test_case_{i} _________________________________",
+            "    def test_case():",
+            ">       assert solve(2) == 5",
+            "E       AssertionError: assert 4 == 5",
+        ]
+    lines.append("=========================== short test summary info ============================")
+    lines += [
+        f"FAILED tests/test_main.py::test_case_{i} - AssertionError: assert 4 == 5"
+        for i in range(failures)
+    ]
+    lines.append(f"========================= {failures} failed, {tests - failures} passed in 1.23s =========================")
+    return "\n".join(lines) + "\n"
+
+
+def vitest_output(tests: int, failures: int) -> str:
+    lines = [" RUN  v1.6.0 /course", ""]
+    lines += [
+        f"   {'×' if i < failures else '✓'} solve > case {i} (1ms)"
+        for i in range(tests)
+    ]
+    for i in range(failures):
+        lines += [
+            f" FAIL  tests/main.test.ts > solve > case {i}",
+            "AssertionError: expected 4 to be 5 // Object.is equality",
+            "    at tests/main.test.ts:5:22",
+            "",
+        ]
+    lines += [
+        f" Tests  {failures} failed | {tests - failures} passed ({tests})",
+        "  Duration  1.23s",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def playwright_output(tests: int, failures: int) -> str:
+    lines = [f"Running {tests} tests using 4 workers", ""]
+    lines += [
+        f"  {'✘' if i < failures else '✓'}  {i + 1} [chromium] › test.spec.js:3:1 › case {i} (120ms)"
+        for i in range(tests)
+    ]
+    lines += [
+        "",
+        f"  {failures} failed",
+        f"  {tests - failures} passed (12.3s)",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# Output generator for each adapter whose parser is benchmarked
+OUTPUTS = {
+    "python": pytest_output,
+    "javascript": vitest_output,
+    "react": vitest_output,
+    "html_css": playwright_output,
+}
@@ -0,0 +1,216 @@
+"""Benchmarks for exrun's hot paths.
+
+    python -m benchmarks.run                      # all benchmarks
+    python -m benchmarks.run -k parse -k progress # only matching names
+    python -m benchmarks.run --compare benchmarks/results/<old>.json
+
+Results are written to ``benchmarks/results/<timestamp>-<commit>.json`` so
+runs from different commits can be compared with ``--compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from rich.console import Console
+
+from benchmarks.generate import generate_course
+from benchmarks.outputs import OUTPUTS
+from exrun.adapters import get_adapter
+from exrun.exercise import detect_language, discover_exercises, load_course_config
+from exrun.models import TestResult
+from exrun.progress import ProgressDB
+from exrun.runner import ExerciseRunner
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Mix modeled on the sample courses, used wherever languages matter
+COURSE_MIX = {"python": 3, "typescript": 1, "react": 1, "html_css": 1, "javascript": 1}
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    """Time ``fn`` ``repeat`` times after one warm-up call, in milliseconds."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "repeat": repeat,
+    }
+
+
+def bench_discovery(workdir: Path, repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for exercises, depth in ((100, 1), (1000, 1), (1000, 3)):
+        course = workdir / f"discover-{exercises}-{depth}"
+        exercises_path = generate_course(course, exercises, depth, COURSE_MIX)
+        config = load_course_config(course / "exrun.toml")
+        results[f"discover_exercises[{exercises}x{depth}]"] = measure(
+            lambda: discover_exercises(exercises_path, config), repeat
+        )
+    return results
+
+
+def bench_detect_language(workdir: Path, repeat: int) -> dict[str, dict[str, float]]:
+    course = workdir / "detect"
+    exercises_path = generate_course(course, 500, 2, COURSE_MIX)
+    config = load_course_config(course / "exrun.toml")
+    exercises = discover_exercises(exercises_path, config)
+    return {
+        "detect_language[500]": measure(
+            lambda: [detect_language(ex, config) for ex in exercises], repeat
+        )
+    }
+
+
+def bench_parse_output(workdir: Path, repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for language, make_output in OUTPUTS.items():
+        adapter = get_adapter(language)
+        for tests in (100, 5000):
+            output = make_output(tests, tests // 10)
+            parse = adapter._parse_output  # type: ignore[attr-defined]
+            results[f"parse_output[{language},{tests}]"] = measure(
+                lambda: parse(output, False, 0), repeat
+            )
+    return results
+
+
+def bench_progress(workdir: Path, repeat: int) -> dict[str, dict[str, float]]:
+    course = workdir / "progress"
+    exercises_path = generate_course(course, 200, 1)
+    config = load_course_config(course / "exrun.toml")
+    exercises = discover_exercises(exercises_path, config)
+    result = TestResult(passed=False, tests_run=10, tests_passed=9, failures=[],
+                        output="x" * 4000, duration_ms=1234)
+    db_counter = iter(range(1_000_000))
+
+    def record_all() -> None:
+        db = ProgressDB(course / f"progress-{next(db_counter)}.db")
+        for exercise in exercises:
+            for _ in range(5):
+                db.record_attempt(exercise, result)
+        db.close()
+
+    populated = ProgressDB(course / "populated.db")
+    for exercise in exercises:
+        for _ in range(20):
+            populated.record_attempt(exercise, result)
+
+    results = {
+        "progress.record_attempt[200x5]": measure(record_all, max(1, repeat // 5)),
+        "progress.get_all_statuses[200]": measure(populated.get_all_statuses, repeat),
+        "progress.get_recent_durations[200]": measure(
+            lambda: [populated.get_recent_durations(ex) for ex in exercises], repeat
+        ),
+    }
+    populated.close()
+    return results
+
+
+def bench_verify(workdir: Path, repeat: int) -> dict[str, dict[str, float]]:
+    """Wall time of ``exrun verify --all`` on a Python course (needs pytest)."""
+    course = workdir / "verify"
+    exercises_path = generate_course(course, 20, 1)
+    runner = ExerciseRunner(Console(file=io.StringIO()))
+    runner.initialize(exercises_path.parent)
+    try:
+        return {"verify_all[python,20]": measure(runner.verify_all, max(1, repeat // 10))}
+    finally:
+        runner.close()
+
+
+BENCHMARKS: dict[str, Callable[[Path, int], dict[str, dict[str, float]]]] = {
+    "discovery": bench_discovery,
+    "detect_language": bench_detect_language,
+    "parse_output": bench_parse_output,
+    "progress": bench_progress,
+    "verify": bench_verify,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict[str, dict[str, float]], baseline_path: Path, threshold: float) -> bool:
+    """Print median changes against a baseline. Returns False on regressions."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    ok = True
+    print(f"\nCompared with {baseline_path.name} (median):")
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], stats["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"  {name:45} {before:10.3f} -> {after:10.3f} ms ({change:+.1%}){flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run exrun benchmarks")
+    parser.add_argument("-k", dest="filters", action="append", default=[],
+                        help="Only run benchmark groups containing this string")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="Baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative median slowdown counted as a regression")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="exrun-bench-") as tmp:
+        for group, bench in BENCHMARKS.items():
+            if args.filters and not any(f in group for f in args.filters):
+                continue
+            workdir = Path(tmp) / group
+            workdir.mkdir()
+            for name, stats in bench(workdir, args.repeat).items():
+                results[name] = stats
+                print(f"{name:45} median {stats['median_ms']:10.3f} ms")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nWrote {output}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 const { defineConfig, devices } = require('@playwright/test');
 
+// exrun serves the course itself and passes each exercise's URL in
+// EXRUN_BASE_URL; the web server below is only for running Playwright directly.
+const baseURL = process.env.EXRUN_BASE_URL;
+
 module.exports = defineConfig({
   testDir: './exercises',
   fullyParallel: true,
@@ -8,7 +12,7 @@ module.exports = defineConfig({
   workers: process.env.CI ? 1 : undefined,
   reporter: 'html',
   use: {
-    baseURL: 'http://localhost:3000',
+    baseURL: baseURL || 'http://localhost:3000',
     trace: 'on-first-retry',
   },
   projects: [
@@ -17,7 +21,7 @@ module.exports = defineConfig({
       use: { ...devices['Desktop Chrome'] },
     },
   ],
-  webServer: {
+  webServer: baseURL ? undefined : {
     command: 'python -m http.server 3000',
     port: 3000,
   },
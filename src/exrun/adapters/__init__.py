@@ -1,5 +1,7 @@
 """Language-specific test adapters."""
 
+from importlib.metadata import EntryPoint, entry_points
+
 from exrun.adapters.base import TestAdapter
 from exrun.adapters.html_css import HtmlCssAdapter
 from exrun.adapters.javascript import JavaScriptAdapter
@@ -16,19 +18,79 @@ __all__ = [
     "HtmlCssAdapter",
     "PyTorchAdapter",
     "ReactAdapter",
+    "ENTRY_POINT_GROUP",
     "get_adapter",
 ]
 
+# Third-party adapters register TestAdapter subclasses in this entry point
+# group, named "<language>:<test_runner>" or just "<language>" to handle any
+# runner of that language, e.g. in pyproject.toml:
+#
+#     [project.entry-points."exrun.adapters"]
+#     "python:pytest-warm" = "exrun_warm:WarmPytestAdapter"
+ENTRY_POINT_GROUP = "exrun.adapters"
+
+# Built-in adapters by (language, test_runner); None is the language's default
+_BUILTIN: dict[tuple[str, str | None], type[TestAdapter]] = {
+    ("python", "pytest"): PythonAdapter,
+    ("python", None): PythonAdapter,
+    ("pytorch", "pytest"): PyTorchAdapter,
+    ("pytorch", None): PyTorchAdapter,
+    ("javascript", "vitest"): JavaScriptAdapter,
+    ("javascript", "jest"): JavaScriptAdapter,
+    ("javascript", None): JavaScriptAdapter,
+    ("typescript", "vitest"): TypeScriptAdapter,
+    ("typescript", None): TypeScriptAdapter,
+    ("react", "vitest"): ReactAdapter,
+    ("react", None): ReactAdapter,
+    ("html_css", "playwright"): HtmlCssAdapter,
+    ("html_css", None): HtmlCssAdapter,
+}
+
+_plugins: dict[tuple[str, str | None], EntryPoint] | None = None
+
+
+def _plugin_entry_points() -> dict[tuple[str, str | None], EntryPoint]:
+    """Registered plugin adapters by key; read once, imported only when chosen."""
+    global _plugins
+    if _plugins is None:
+        _plugins = {}
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            language, _, test_runner = entry_point.name.partition(":")
+            _plugins[(language, test_runner or None)] = entry_point
+    return _plugins
+
+
+def _adapter_class(key: tuple[str, str | None]) -> type[TestAdapter] | None:
+    if key in _BUILTIN:
+        return _BUILTIN[key]
+    entry_point = _plugin_entry_points().get(key)
+    return entry_point.load() if entry_point is not None else None
+
+
+def get_adapter(language: str, test_runner: str | None = None) -> TestAdapter:
+    """Get the adapter for a language and test runner.
 
-def get_adapter(language: str) -> TestAdapter:
-    """Get the appropriate adapter for a language."""
-    adapters: dict[str, type[TestAdapter]] = {
-        "python": PythonAdapter,
-        "javascript": JavaScriptAdapter,
-        "typescript": TypeScriptAdapter,
-        "html_css": HtmlCssAdapter,
-        "pytorch": PyTorchAdapter,
-        "react": ReactAdapter,
-    }
-    adapter_class = adapters.get(language, PythonAdapter)
-    return adapter_class()
+    Without a runner, the language's default adapter is used. Built-in
+    adapters take precedence over plugins registered under the same key.
+    Raises LookupError for languages no adapter handles, and for runners no
+    adapter of the language supports.
+    """
+    adapter_class = _adapter_class((language, test_runner))
+    if adapter_class is None and test_runner is not None and (language, None) not in _BUILTIN:
+        # A plugin registered under just the language handles any of its runners
+        adapter_class = _adapter_class((language, None))
+    if adapter_class is None:
+        if test_runner is not None and (language, None) in _BUILTIN:
+            runners = sorted(runner for lang, runner in _BUILTIN if lang == language and runner)
+            raise LookupError(
+                f"Unknown test_runner {test_runner!r} for language {language!r}; "
+                f"expected one of {', '.join(runners)}"
+            )
+        raise LookupError(
+            f"No test adapter for language {language!r}; install a plugin that registers "
+            f"one in the {ENTRY_POINT_GROUP!r} entry point group"
+        )
+    adapter = adapter_class()
+    adapter.test_runner = test_runner
+    return adapter
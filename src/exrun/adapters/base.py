@@ -1,13 +1,33 @@
 """Abstract base adapter for test runners."""
 
+import os
 from abc import ABC, abstractmethod
 
-from exrun.models import Exercise, TestResult
+from exrun.cpu import thread_env
+from exrun.limits import describe_limit
+from exrun.models import Exercise, FailureKind, TestFailure, TestResult
+from exrun.process import CommandResult
 
 
 class TestAdapter(ABC):
     """Abstract base class for language-specific test adapters."""
 
+    # Whether memory limits may fall back to RLIMIT_AS. V8 and Chromium
+    # reserve far more address space than they use, so Node-based adapters
+    # only get memory limits through cgroups.
+    limit_address_space: bool = True
+
+    # Lower bound for the configured timeout, for toolchains with slow startup
+    min_timeout_seconds: int = 0
+
+    # Expected duration of a run before an exercise has history, used to
+    # order batch runs longest-first
+    typical_duration_ms: int = 5000
+
+    # The test runner the adapter was selected for, None for the language's
+    # default; set by get_adapter
+    test_runner: str | None = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -20,10 +40,42 @@ class TestAdapter(ABC):
         ...
 
     @abstractmethod
-    def get_default_command(self, exercise: Exercise) -> str:
-        """Get the default test command for this adapter."""
+    def get_default_command(self, exercise: Exercise) -> list[str]:
+        """Get the default test command (an argv list) for this adapter."""
         ...
 
+    def prepare(self, exercise: Exercise) -> str | None:
+        """Warm caches so the first run is as fast as later ones.
+
+        Returns a description of what went wrong, or None.
+        """
+        return None
+
+    def ensure_dependencies(self, exercise: Exercise) -> TestResult | None:
+        """Install the packages the exercise's project needs, unless already installed.
+
+        Returns a failed result when installing failed, or None.
+        """
+        return None
+
+    def _get_env(self, exercise: Exercise) -> dict[str, str]:
+        """Environment for test processes, with thread pools sized to the run's CPUs."""
+        return {**os.environ, **thread_env()}
+
+    def _check_limits(
+        self, exercise: Exercise, proc: CommandResult, result: TestResult
+    ) -> TestResult:
+        """Mark a run as failed when a resource limit terminated it."""
+        if proc.limit_exceeded is None:
+            return result
+        result.passed = False
+        result.failures.insert(0, TestFailure(
+            test_name="resource_limit",
+            message=describe_limit(exercise.config.limits, proc.limit_exceeded),
+            kind=FailureKind.RESOURCE_LIMIT,
+        ))
+        return result
+
     def is_available(self) -> bool:
         """Check if this adapter's dependencies are available."""
         return True
@@ -1,48 +1,130 @@
-"""HTML/CSS test adapter using Playwright."""
+"""HTML/CSS test adapter using Playwright.
 
+Pages are served by one static file server inside the exrun process, bound to
+an ephemeral port and shared by every run: each course (or overlay of one) is
+mounted under its own URL prefix, and Playwright gets the exercise's URL in
+``EXRUN_BASE_URL``. Concurrent runs on one host therefore never compete for a
+fixed port, and no server process is started per run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
 import re
 import shutil
 import subprocess
+import threading
 import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
 
 from exrun.adapters.base import TestAdapter
-from exrun.models import Exercise, TestFailure, TestResult
+from exrun.cpu import test_workers
+from exrun.exercise import find_project_root
+from exrun.models import Exercise, FailureKind, TestFailure, TestResult
+from exrun.process import run_command
+from exrun.toolchain import node_tool
+from exrun.tracing import span
+
+
+class _MountHandler(SimpleHTTPRequestHandler):
+    """Serves ``/<mount>/<path>`` from the directory registered for the mount."""
+
+    mounts: dict[str, Path] = {}
+
+    def translate_path(self, path: str) -> str:
+        mount, _, rest = path.lstrip("/").partition("/")
+        root = self.mounts.get(mount)
+        if root is None:
+            return str(Path(os.devnull) / "missing")
+        self.directory = str(root)
+        return super().translate_path("/" + rest)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _StaticServer:
+    """Process-wide static file server, started on first use."""
+
+    _lock = threading.Lock()
+    _server: ThreadingHTTPServer | None = None
+
+    @classmethod
+    def url_for(cls, root: Path, path: Path) -> str:
+        """URL of ``path`` (a directory under ``root``), mounting ``root`` if needed."""
+        root = root.resolve()
+        mount = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+        with cls._lock:
+            if cls._server is None:
+                cls._server = ThreadingHTTPServer(("127.0.0.1", 0), _MountHandler)
+                cls._server.daemon_threads = True
+                threading.Thread(
+                    target=cls._server.serve_forever, name="exrun-static", daemon=True
+                ).start()
+            _MountHandler.mounts[mount] = root
+            port = cls._server.server_address[1]
+        relative = path.resolve().relative_to(root).as_posix()
+        suffix = "" if relative == "." else f"{relative}/"
+        return f"http://127.0.0.1:{port}/{mount}/{suffix}"
 
 
 class HtmlCssAdapter(TestAdapter):
     """Adapter for HTML/CSS tests using Playwright."""
 
+    limit_address_space = False
+    typical_duration_ms = 8000
+
     @property
     def name(self) -> str:
         return "HTML/CSS (Playwright)"
 
-    def get_default_command(self, exercise: Exercise) -> str:
-        return f"npx playwright test {exercise.tests_path} --reporter=list"
+    def get_default_command(self, exercise: Exercise) -> list[str]:
+        playwright = node_tool("playwright", exercise.path)
+        command = [*playwright, "test", str(exercise.tests_path), "--reporter=list"]
+        workers = test_workers(exercise.config.test_workers)
+        if workers is not None:
+            command.append(f"--workers={workers}")
+        return command
+
+    def _get_env(self, exercise: Exercise) -> dict[str, str]:
+        """Environment with the exercise's URL on the shared static server."""
+        env = super()._get_env(exercise)
+        env["EXRUN_BASE_URL"] = _StaticServer.url_for(
+            find_project_root(exercise), exercise.path
+        )
+        return env
 
     def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
         cmd = self.get_default_command(exercise)
 
         start = time.time()
         try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=exercise.path,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-            output = result.stdout + result.stderr
-            duration_ms = int((time.time() - start) * 1000)
-
-            return self._parse_output(output, result.returncode == 0, duration_ms)
+            env = self._get_env(exercise)
+            with span("test_process", command=cmd):
+                proc = run_command(
+                    cmd,
+                    cwd=find_project_root(exercise),
+                    timeout=timeout,
+                    env=env,
+                    limits=exercise.config.limits,
+                    limit_address_space=self.limit_address_space,
+                )
+            with span("parse_output", output_chars=len(proc.output)):
+                result = self._parse_output(proc.output, proc.returncode == 0, proc.duration_ms)
+            result.usage = proc.usage
+            return self._check_limits(exercise, proc, result)
 
         except subprocess.TimeoutExpired:
             return TestResult(
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("timeout", f"Tests timed out after {timeout}s")],
+                failures=[TestFailure(
+                    "timeout", f"Tests timed out after {timeout}s", kind=FailureKind.TIMEOUT
+                )],
                 output=f"Tests timed out after {timeout} seconds",
                 duration_ms=timeout * 1000,
             )
@@ -51,7 +133,7 @@ class HtmlCssAdapter(TestAdapter):
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("error", str(e))],
+                failures=[TestFailure("error", str(e), kind=FailureKind.ERROR)],
                 output=str(e),
                 duration_ms=int((time.time() - start) * 1000),
             )
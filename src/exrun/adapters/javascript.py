@@ -9,31 +9,52 @@ import time
 from pathlib import Path
 
 from exrun.adapters.base import TestAdapter
-from exrun.models import Exercise, TestFailure, TestResult
+from exrun.cache import project_cache_dir, project_lock
+from exrun.cpu import test_workers
+from exrun.exercise import find_project_root
+from exrun.models import Exercise, FailureKind, TestFailure, TestResult
+from exrun.process import run_command
+from exrun.toolchain import node_tool
+from exrun.tracing import span
 
 
 class JavaScriptAdapter(TestAdapter):
     """Adapter for JavaScript tests using Jest or Vitest."""
 
+    limit_address_space = False
+    typical_duration_ms = 3000
+
     @property
     def name(self) -> str:
         return "JavaScript (vitest/jest)"
 
-    def _find_project_root(self, exercise: Exercise) -> Path:
-        """Find the project root (where package.json lives)."""
-        current = exercise.path
-        while current.parent != current:
-            if (current / "package.json").exists():
-                return current
-            current = current.parent
-        return exercise.path
-
-    def get_default_command(self, exercise: Exercise) -> str:
-        project_root = self._find_project_root(exercise)
-        if self._has_vitest(project_root):
+    def get_default_command(self, exercise: Exercise) -> list[str]:
+        project_root = find_project_root(exercise)
+        if self.test_runner == "vitest" or (
+            self.test_runner is None and self._has_vitest(project_root)
+        ):
             test_path = exercise.tests_path.relative_to(project_root)
-            return f"npx vitest run {test_path} --reporter=verbose"
-        return "npx jest --verbose"
+            return [
+                *node_tool("vitest", project_root), "run", str(test_path), "--reporter=verbose",
+                *self._worker_args(exercise),
+            ]
+        # Only the exercise's tests: a bare "jest" would run every test file in
+        # the project. Jest matches the pattern (a regex) against absolute paths.
+        test_pattern = f"^{re.escape(str(exercise.tests_path.resolve()))}/"
+        cache_dir = project_cache_dir("jest", project_root)
+        return [
+            *node_tool("jest", project_root),
+            "--verbose",
+            "--cacheDirectory",
+            str(cache_dir),
+            *self._worker_args(exercise),
+            test_pattern,
+        ]
+
+    def _worker_args(self, exercise: Exercise) -> list[str]:
+        """Cap the worker pool (vitest and jest share the flag)."""
+        workers = test_workers(exercise.config.test_workers)
+        return [] if workers is None else [f"--maxWorkers={workers}"]
 
     def _has_vitest(self, project_root: Path) -> bool:
         """Check if vitest is configured."""
@@ -56,14 +77,14 @@ class JavaScriptAdapter(TestAdapter):
             )
 
         try:
-            result = subprocess.run(
-                "npm install",
-                shell=True,
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
+            with span("npm_install"):
+                result = subprocess.run(
+                    ["npm", "install"],
+                    cwd=project_root,
+                    capture_output=True,
+                    text=True,
+                    timeout=120,
+                )
             if result.returncode != 0:
                 return TestResult(
                     passed=False,
@@ -88,37 +109,47 @@ class JavaScriptAdapter(TestAdapter):
                 output="npm install timed out after 120 seconds",
             )
 
-    def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
-        project_root = self._find_project_root(exercise)
-
-        if not (project_root / "node_modules").exists():
+    def ensure_dependencies(self, exercise: Exercise) -> TestResult | None:
+        project_root = find_project_root(exercise)
+        # Runs of a batch share the project: one installs, the others wait for it
+        with project_lock("npm-install", project_root):
+            if (project_root / "node_modules").exists():
+                return None
             install_result = self._install_dependencies(project_root)
-            if not install_result.passed:
-                return install_result
+        return None if install_result.passed else install_result
 
+    def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
+        install_result = self.ensure_dependencies(exercise)
+        if install_result is not None:
+            return install_result
+
+        project_root = find_project_root(exercise)
         cmd = self.get_default_command(exercise)
 
         start = time.time()
         try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-            output = result.stdout + result.stderr
-            duration_ms = int((time.time() - start) * 1000)
-
-            return self._parse_output(output, result.returncode == 0, duration_ms)
+            with span("test_process", command=cmd):
+                proc = run_command(
+                    cmd,
+                    cwd=project_root,
+                    timeout=timeout,
+                    env=self._get_env(exercise),
+                    limits=exercise.config.limits,
+                    limit_address_space=self.limit_address_space,
+                )
+            with span("parse_output", output_chars=len(proc.output)):
+                result = self._parse_output(proc.output, proc.returncode == 0, proc.duration_ms)
+            result.usage = proc.usage
+            return self._check_limits(exercise, proc, result)
 
         except subprocess.TimeoutExpired:
             return TestResult(
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("timeout", f"Tests timed out after {timeout}s")],
+                failures=[TestFailure(
+                    "timeout", f"Tests timed out after {timeout}s", kind=FailureKind.TIMEOUT
+                )],
                 output=f"Tests timed out after {timeout} seconds",
                 duration_ms=timeout * 1000,
             )
@@ -127,7 +158,7 @@ class JavaScriptAdapter(TestAdapter):
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("error", str(e))],
+                failures=[TestFailure("error", str(e), kind=FailureKind.ERROR)],
                 output=str(e),
                 duration_ms=int((time.time() - start) * 1000),
             )
@@ -1,52 +1,121 @@
 """Python/pytest test adapter."""
 
+import functools
 import re
 import subprocess
 import time
 
 from exrun.adapters.base import TestAdapter
-from exrun.models import Exercise, TestFailure, TestResult
+from exrun.cache import project_cache_dir, pycache_prefix
+from exrun.cpu import test_workers
+from exrun.environments import PythonEnv, environment_for, exercise_requirements
+from exrun.exercise import find_project_root
+from exrun.models import Exercise, FailureKind, TestFailure, TestResult
+from exrun.process import run_command
+from exrun.toolchain import python_tool
+from exrun.tracing import span
+
+
+@functools.cache
+def _has_xdist(pytest: tuple[str, ...]) -> bool:
+    """Whether this pytest can load pytest-xdist, which ``-n`` needs."""
+    try:
+        proc = subprocess.run(
+            [*pytest, "-p", "xdist", "--help"], capture_output=True, timeout=30, check=False
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return proc.returncode == 0
 
 
 class PythonAdapter(TestAdapter):
     """Adapter for Python tests using pytest."""
 
+    typical_duration_ms = 1500
+
     @property
     def name(self) -> str:
         return "Python (pytest)"
 
-    def get_default_command(self, exercise: Exercise) -> str:
+    def _environment(self, exercise: Exercise) -> PythonEnv | None:
+        """The cached environment for the exercise's requirements, if it declares any."""
+        requirements = exercise_requirements(exercise)
+        if not requirements:
+            return None
+        with span("python_env"):
+            return environment_for(requirements)
+
+    def _pytest(self, exercise: Exercise) -> list[str]:
+        """Argv prefix running pytest in the exercise's environment."""
+        env = self._environment(exercise)
+        return [str(env.python), "-m", "pytest"] if env else [*python_tool("pytest")]
+
+    def _pytest_command(self, exercise: Exercise, *args: str) -> list[str]:
+        pytest = self._pytest(exercise)
+        # The course root, where exrun.toml lives, owns the exercise's caches
+        cache_dir = project_cache_dir("pytest", find_project_root(exercise, "exrun.toml"))
+        pytest += ["-o", f"cache_dir={cache_dir}"]
         # Check for tests/ subdirectory first
         if exercise.tests_path.exists():
-            return f"pytest {exercise.tests_path} -v --tb=short"
+            return [*pytest, str(exercise.tests_path), *args]
         # Otherwise run pytest in the exercise directory (flat structure)
-        return "pytest -v --tb=short"
-
-    def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
-        cmd = self.get_default_command(exercise)
-
-        start = time.time()
+        return [*pytest, *args]
+
+    def get_default_command(self, exercise: Exercise) -> list[str]:
+        args = ["-v", "--tb=short"]
+        if exercise.config.test_workers is not None:
+            workers = test_workers(exercise.config.test_workers) or 1
+            if workers > 1 and _has_xdist(tuple(self._pytest(exercise))):
+                args += ["-n", str(workers)]
+        return self._pytest_command(exercise, *args)
+
+    def prepare(self, exercise: Exercise) -> str | None:
+        """Collect the tests once, caching their (assertion-rewritten) bytecode."""
         try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
+            proc = run_command(
+                self._pytest_command(exercise, "--collect-only", "-q"),
                 cwd=exercise.path,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+                timeout=exercise.config.timeout_seconds,
                 env=self._get_env(exercise),
+                limits=exercise.config.limits,
+                limit_address_space=self.limit_address_space,
             )
-            output = result.stdout + result.stderr
-            duration_ms = int((time.time() - start) * 1000)
+        except subprocess.TimeoutExpired:
+            return "test collection timed out"
+        except Exception as e:
+            return str(e)
+        # 5 means no tests were collected, which is not a problem here
+        if proc.returncode not in (0, 5):
+            return f"test collection failed (exit code {proc.returncode})"
+        return None
 
-            return self._parse_output(output, result.returncode == 0, duration_ms)
+    def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
+        start = time.time()
+        try:
+            cmd = self.get_default_command(exercise)
+            env = self._get_env(exercise)
+            with span("test_process", command=cmd):
+                proc = run_command(
+                    cmd,
+                    cwd=exercise.path,
+                    timeout=timeout,
+                    env=env,
+                    limits=exercise.config.limits,
+                    limit_address_space=self.limit_address_space,
+                )
+            with span("parse_output", output_chars=len(proc.output)):
+                result = self._parse_output(proc.output, proc.returncode == 0, proc.duration_ms)
+            result.usage = proc.usage
+            return self._check_limits(exercise, proc, result)
 
         except subprocess.TimeoutExpired:
             return TestResult(
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("timeout", f"Tests timed out after {timeout}s")],
+                failures=[TestFailure(
+                    "timeout", f"Tests timed out after {timeout}s", kind=FailureKind.TIMEOUT
+                )],
                 output=f"Tests timed out after {timeout} seconds",
                 duration_ms=timeout * 1000,
             )
@@ -55,7 +124,7 @@ class PythonAdapter(TestAdapter):
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("error", str(e))],
+                failures=[TestFailure("error", str(e), kind=FailureKind.ERROR)],
                 output=str(e),
                 duration_ms=int((time.time() - start) * 1000),
             )
@@ -64,7 +133,7 @@ class PythonAdapter(TestAdapter):
         """Get environment variables for running tests."""
         import os
 
-        env = os.environ.copy()
+        env = super()._get_env(exercise)
         # Add src/ to PYTHONPATH if it exists, otherwise add the exercise dir
         if exercise.src_path.exists():
             pythonpath = str(exercise.src_path)
@@ -73,6 +142,12 @@ class PythonAdapter(TestAdapter):
         if "PYTHONPATH" in env:
             pythonpath = f"{pythonpath}:{env['PYTHONPATH']}"
         env["PYTHONPATH"] = pythonpath
+        # Keep bytecode out of the course tree, shared across runs and exercises
+        env["PYTHONPYCACHEPREFIX"] = str(pycache_prefix())
+        python_env = self._environment(exercise)
+        if python_env is not None:
+            env["VIRTUAL_ENV"] = str(python_env.path)
+            env["PATH"] = f"{python_env.path / 'bin'}{os.pathsep}{env.get('PATH', '')}"
         return env
 
     def _parse_output(self, output: str, success: bool, duration_ms: int) -> TestResult:
@@ -1,13 +1,39 @@
 """PyTorch test adapter with GPU detection."""
 
+import functools
+import subprocess
+import sys
 
 from exrun.adapters.python import PythonAdapter
-from exrun.models import Exercise, TestResult
+from exrun.models import Exercise
+from exrun.tracing import span
+
+
+@functools.cache
+def _torch_device(python: str) -> str | None:
+    """What torch finds in an interpreter: "cuda", "cpu", or None without torch."""
+    try:
+        with span("cuda_probe"):
+            result = subprocess.run(
+                [python, "-c", "import torch; print(torch.cuda.is_available())"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                check=False,
+            )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return "cuda" if result.stdout.strip().lower() == "true" else "cpu"
 
 
 class PyTorchAdapter(PythonAdapter):
     """Adapter for PyTorch tests using pytest with GPU handling."""
 
+    min_timeout_seconds = 60
+    typical_duration_ms = 20000
+
     @property
     def name(self) -> str:
         return "PyTorch (pytest)"
@@ -16,40 +42,17 @@ class PyTorchAdapter(PythonAdapter):
         """Get environment variables, including CUDA settings."""
         env = super()._get_env(exercise)
 
-        if not self._cuda_available():
+        if not self._cuda_available(exercise):
             env["CUDA_VISIBLE_DEVICES"] = ""
 
         return env
 
-    def _cuda_available(self) -> bool:
-        """Check if CUDA is available."""
-        try:
-            import subprocess
-
-            result = subprocess.run(
-                ["python", "-c", "import torch; print(torch.cuda.is_available())"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            return result.stdout.strip().lower() == "true"
-        except Exception:
-            return False
-
-    def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
-        timeout = max(timeout, exercise.config.timeout_seconds, 60)
-        return super().run_tests(exercise, timeout)
+    def _cuda_available(self, exercise: Exercise) -> bool:
+        """Check if CUDA is available to the interpreter the exercise's tests run in."""
+        env = self._environment(exercise)
+        python = str(env.python) if env else sys.executable
+        return _torch_device(python) == "cuda"
 
     def is_available(self) -> bool:
         """Check if PyTorch is installed."""
-        try:
-            import subprocess
-
-            result = subprocess.run(
-                ["python", "-c", "import torch"],
-                capture_output=True,
-                timeout=10,
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        return _torch_device(sys.executable) is not None
@@ -9,60 +9,75 @@ import time
 from pathlib import Path
 
 from exrun.adapters.base import TestAdapter
-from exrun.models import Exercise, TestFailure, TestResult
+from exrun.cache import project_lock
+from exrun.cpu import test_workers
+from exrun.exercise import find_project_root
+from exrun.models import Exercise, FailureKind, TestFailure, TestResult
+from exrun.process import run_command
+from exrun.toolchain import node_tool
+from exrun.tracing import span
 
 
 class ReactAdapter(TestAdapter):
     """Adapter for React tests using Vitest and React Testing Library."""
 
+    limit_address_space = False
+    typical_duration_ms = 4000
+
     @property
     def name(self) -> str:
         return "React (vitest + testing-library)"
 
-    def get_default_command(self, exercise: Exercise) -> str:
-        test_path = exercise.tests_path.relative_to(self._find_project_root(exercise))
-        return f"npx vitest run {test_path} --reporter=verbose"
-
-    def _find_project_root(self, exercise: Exercise) -> Path:
-        """Find the project root (where package.json lives)."""
-        current = exercise.path
-        while current.parent != current:
-            if (current / "package.json").exists():
-                return current
-            current = current.parent
-        return exercise.path
+    def get_default_command(self, exercise: Exercise) -> list[str]:
+        project_root = find_project_root(exercise)
+        test_path = exercise.tests_path.relative_to(project_root)
+        command = [*node_tool("vitest", project_root), "run", str(test_path), "--reporter=verbose"]
+        workers = test_workers(exercise.config.test_workers)
+        if workers is not None:
+            command.append(f"--maxWorkers={workers}")
+        return command
+
+    def ensure_dependencies(self, exercise: Exercise) -> TestResult | None:
+        project_root = find_project_root(exercise)
+        # Runs of a batch share the project: one installs, the others wait for it
+        with project_lock("npm-install", project_root):
+            if (project_root / "node_modules").exists():
+                return None
+            install_result = self._install_dependencies(project_root)
+        return None if install_result.passed else install_result
 
     def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
-        project_root = self._find_project_root(exercise)
-
-        if not (project_root / "node_modules").exists():
-            install_result = self._install_dependencies(project_root)
-            if not install_result.passed:
-                return install_result
+        install_result = self.ensure_dependencies(exercise)
+        if install_result is not None:
+            return install_result
 
+        project_root = find_project_root(exercise)
         cmd = self.get_default_command(exercise)
 
         start = time.time()
         try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-            output = result.stdout + result.stderr
-            duration_ms = int((time.time() - start) * 1000)
-
-            return self._parse_output(output, result.returncode == 0, duration_ms)
+            with span("test_process", command=cmd):
+                proc = run_command(
+                    cmd,
+                    cwd=project_root,
+                    timeout=timeout,
+                    env=self._get_env(exercise),
+                    limits=exercise.config.limits,
+                    limit_address_space=self.limit_address_space,
+                )
+            with span("parse_output", output_chars=len(proc.output)):
+                result = self._parse_output(proc.output, proc.returncode == 0, proc.duration_ms)
+            result.usage = proc.usage
+            return self._check_limits(exercise, proc, result)
 
         except subprocess.TimeoutExpired:
             return TestResult(
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("timeout", f"Tests timed out after {timeout}s")],
+                failures=[TestFailure(
+                    "timeout", f"Tests timed out after {timeout}s", kind=FailureKind.TIMEOUT
+                )],
                 output=f"Tests timed out after {timeout} seconds",
                 duration_ms=timeout * 1000,
             )
@@ -71,7 +86,7 @@ class ReactAdapter(TestAdapter):
                 passed=False,
                 tests_run=0,
                 tests_passed=0,
-                failures=[TestFailure("error", str(e))],
+                failures=[TestFailure("error", str(e), kind=FailureKind.ERROR)],
                 output=str(e),
                 duration_ms=int((time.time() - start) * 1000),
             )
@@ -89,14 +104,14 @@ class ReactAdapter(TestAdapter):
             )
 
         try:
-            result = subprocess.run(
-                "npm install",
-                shell=True,
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
+            with span("npm_install"):
+                result = subprocess.run(
+                    ["npm", "install"],
+                    cwd=project_root,
+                    capture_output=True,
+                    text=True,
+                    timeout=120,
+                )
             if result.returncode != 0:
                 return TestResult(
                     passed=False,
@@ -1,35 +1,39 @@
 """TypeScript test adapter (Vitest with tsc)."""
 
-import subprocess
-
 from exrun.adapters.javascript import JavaScriptAdapter
+from exrun.exercise import find_project_root
 from exrun.models import Exercise, TestFailure, TestResult
+from exrun.process import run_command
+from exrun.toolchain import node_tool
+from exrun.tracing import span
 
 
 class TypeScriptAdapter(JavaScriptAdapter):
     """Adapter for TypeScript tests using Vitest with type checking."""
 
+    typical_duration_ms = 6000  # tsc, then the tests
+
     @property
     def name(self) -> str:
         return "TypeScript (vitest)"
 
     def run_tests(self, exercise: Exercise, timeout: int = 30) -> TestResult:
-        project_root = self._find_project_root(exercise)
-
-        if not (project_root / "node_modules").exists():
-            install_result = self._install_dependencies(project_root)
-            if not install_result.passed:
-                return install_result
+        install_result = self.ensure_dependencies(exercise)
+        if install_result is not None:
+            return install_result
 
         tsc_result = self._run_type_check(exercise)
         if not tsc_result.passed:
             return tsc_result
 
-        return super().run_tests(exercise, timeout)
+        result = super().run_tests(exercise, timeout)
+        if tsc_result.usage and result.usage:
+            result.usage = tsc_result.usage + result.usage
+        return result
 
     def _run_type_check(self, exercise: Exercise) -> TestResult:
         """Run TypeScript type checking."""
-        project_root = self._find_project_root(exercise)
+        project_root = find_project_root(exercise)
         tsconfig = project_root / "tsconfig.json"
 
         if not tsconfig.exists():
@@ -44,14 +48,21 @@ class TypeScriptAdapter(JavaScriptAdapter):
                 )
 
         try:
-            result = subprocess.run(
-                "npx tsc --noEmit",
-                shell=True,
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
+            with span("tsc"):
+                result = run_command(
+                    [*node_tool("tsc", project_root), "--noEmit"],
+                    cwd=project_root,
+                    timeout=30,
+                    env=self._get_env(exercise),
+                    limits=exercise.config.limits,
+                    limit_address_space=self.limit_address_space,
+                )
+
+            if result.limit_exceeded:
+                failed = TestResult(
+                    passed=False, tests_run=1, tests_passed=0, failures=[], output=result.output
+                )
+                return self._check_limits(exercise, result, failed)
 
             if result.returncode != 0:
                 return TestResult(
@@ -60,9 +71,11 @@ class TypeScriptAdapter(JavaScriptAdapter):
                     tests_passed=0,
                     failures=[TestFailure(
                         test_name="type_check",
-                        message=(result.stdout + result.stderr)[:500],
+                        message=result.output[:500],
                     )],
-                    output=result.stdout + result.stderr,
+                    output=result.output,
+                    duration_ms=result.duration_ms,
+                    usage=result.usage,
                 )
 
             return TestResult(
@@ -71,6 +84,8 @@ class TypeScriptAdapter(JavaScriptAdapter):
                 tests_passed=0,
                 failures=[],
                 output="Type check passed",
+                duration_ms=result.duration_ms,
+                usage=result.usage,
             )
 
         except Exception as e:
@@ -0,0 +1,325 @@
+"""SQLite-backed job queue for distributed grading.
+
+The broker is a single SQLite file in a directory shared by the coordinator
+and all workers. Workers lease jobs for a limited time and renew the lease
+while a job runs; a job whose lease expires (because its worker crashed or
+lost the shared directory) is handed to the next worker that asks.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+from rich.progress import Progress
+
+from exrun.cpu import CpuBudget
+from exrun.grading import (
+    Grader,
+    GradeOutcome,
+    result_from_dict,
+    result_to_dict,
+)
+from exrun.models import FailureKind, TestFailure, TestResult
+from exrun.runner import ExerciseRunner
+
+DEFAULT_LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+
+
+@dataclass
+class Lease:
+    job_id: int
+    payload: dict[str, Any]
+    attempts: int
+
+
+class JobBroker:
+    """A job queue stored in ``<broker_dir>/queue.db``."""
+
+    def __init__(self, broker_dir: Path, busy_timeout_ms: int = 30000):
+        broker_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = broker_dir / "queue.db"
+        # Shared between worker threads; every access goes through self._lock
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=busy_timeout_ms / 1000, check_same_thread=False
+        )
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                batch TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                enqueued_at REAL NOT NULL,
+                finished_at REAL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch, status);
+        """)
+        self.conn.commit()
+
+    def enqueue(self, batch: str, payloads: list[dict[str, Any]]) -> None:
+        """Add jobs for a batch, preserving their order."""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO jobs (batch, payload, enqueued_at) VALUES (?, ?, ?)",
+                [(batch, json.dumps(payload), now) for payload in payloads],
+            )
+
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Lease | None:
+        """Take the oldest available job, reclaiming ones with expired leases."""
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock so two workers cannot
+            # lease the same job
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_exhausted(now)
+                row = self.conn.execute(
+                    """
+                    SELECT id, payload, attempts FROM jobs
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY id
+                    LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self.conn.commit()
+                    return None
+                self.conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1
+                    WHERE id = ?
+                    """,
+                    (worker, now + lease_seconds, row["id"]),
+                )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        return Lease(row["id"], json.loads(row["payload"]), row["attempts"] + 1)
+
+    def _fail_exhausted(self, now: float) -> None:
+        """Give up on expired jobs that already crashed MAX_ATTEMPTS workers."""
+        result = TestResult(
+            passed=False,
+            tests_run=0,
+            tests_passed=0,
+            failures=[TestFailure(
+                "worker_lost",
+                f"No worker finished this job after {MAX_ATTEMPTS} attempts",
+                kind=FailureKind.ERROR,
+            )],
+            output="",
+        )
+        self.conn.execute(
+            """
+            UPDATE jobs SET status = 'done', result = ?, finished_at = ?
+            WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+            """,
+            (json.dumps(result_to_dict(result)), now, now, MAX_ATTEMPTS),
+        )
+
+    def renew(self, job_id: int, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease. Returns False if the job was reassigned meanwhile."""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE jobs SET lease_expires = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'
+                """,
+                (time.time() + lease_seconds, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: TestResult) -> None:
+        """Store a job's result. The first result reported for a job wins."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                UPDATE jobs SET status = 'done', worker = ?, result = ?, finished_at = ?
+                WHERE id = ? AND status != 'done'
+                """,
+                (worker, json.dumps(result_to_dict(result)), time.time(), job_id),
+            )
+
+    def counts(self, batch: str | None = None) -> dict[str, int]:
+        """Number of jobs per status in a batch, or in the whole queue."""
+        with self._lock:
+            if batch is None:
+                cursor = self.conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+                )
+            else:
+                cursor = self.conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM jobs WHERE batch = ? GROUP BY status",
+                    (batch,),
+                )
+            return {row["status"]: row["n"] for row in cursor}
+
+    def results(self, batch: str) -> list[tuple[dict[str, Any], TestResult]]:
+        """Payloads and results of all finished jobs in a batch."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT payload, result FROM jobs WHERE batch = ? AND status = 'done' ORDER BY id",
+                (batch,),
+            ).fetchall()
+        return [(json.loads(row["payload"]), result_from_dict(json.loads(row["result"])))
+                for row in rows]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def grade_via_broker(
+    grader: Grader,
+    broker: JobBroker,
+    submissions: dict[str, Path],
+    poll_interval: float = 1.0,
+) -> list[GradeOutcome]:
+    """Enqueue every job for workers and wait for all results."""
+    batch = uuid.uuid4().hex
+    course_path = str(grader.course_root.resolve())
+    payloads = [
+        {
+            "course": course_path,
+            "student": job.student,
+            "student_root": str(submissions[job.student].resolve()),
+            "exercise_key": job.exercise_key,
+        }
+        for job in grader.build_jobs(submissions)
+    ]
+    broker.enqueue(batch, payloads)
+
+    with Progress(console=grader.console, transient=True) as progress:
+        task = progress.add_task("Waiting for workers", total=len(payloads))
+        while True:
+            done = broker.counts(batch).get("done", 0)
+            progress.update(task, completed=done)
+            if done >= len(payloads):
+                break
+            time.sleep(poll_interval)
+
+    outcomes = [
+        GradeOutcome(payload["student"], payload["exercise_key"], result)
+        for payload, result in broker.results(batch)
+    ]
+    return grader.sort_outcomes(outcomes)
+
+
+class GradingWorker:
+    """Pulls jobs from a broker and runs them with warm per-course graders."""
+
+    def __init__(
+        self,
+        broker: JobBroker,
+        console: Console | None = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ):
+        self.broker = broker
+        self.console = console or Console()
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._graders: dict[str, Grader] = {}
+        self._graders_lock = threading.Lock()
+
+    def _grader_for(self, course_path: str) -> Grader:
+        """Discover each course once per worker and keep its adapters warm."""
+        with self._graders_lock:
+            grader = self._graders.get(course_path)
+            if grader is None:
+                runner = ExerciseRunner(self.console)
+                if not runner.initialize(Path(course_path)):
+                    raise RuntimeError(f"Cannot load course at {course_path}")
+                grader = Grader(runner.course_config, runner.exercises, self.console)
+                runner.close()
+                self._graders[course_path] = grader
+            return grader
+
+    def _run(self, lease: Lease) -> TestResult:
+        payload = lease.payload
+        grader = self._grader_for(payload["course"])
+        job = grader.job_for(
+            payload["student"], Path(payload["student_root"]), payload["exercise_key"]
+        )
+        return grader.run_job(job).result
+
+    def process_one(self, worker_id: str) -> bool:
+        """Lease and run a single job. Returns False if the queue was empty."""
+        lease = self.broker.lease(worker_id, self.lease_seconds)
+        if lease is None:
+            return False
+
+        finished = threading.Event()
+
+        def keep_alive() -> None:
+            while not finished.wait(self.lease_seconds / 3):
+                self.broker.renew(lease.job_id, worker_id, self.lease_seconds)
+
+        heartbeat = threading.Thread(target=keep_alive, daemon=True)
+        heartbeat.start()
+        try:
+            result = self._run(lease)
+        except Exception as e:
+            result = TestResult(
+                passed=False,
+                tests_run=0,
+                tests_passed=0,
+                failures=[TestFailure("error", str(e), kind=FailureKind.ERROR)],
+                output=str(e),
+            )
+        finally:
+            finished.set()
+            heartbeat.join()
+
+        self.broker.complete(lease.job_id, worker_id, result)
+        payload = lease.payload
+        mark = "[green]✓[/green]" if result.passed else "[red]✗[/red]"
+        self.console.print(f"{mark} {payload['student']} {payload['exercise_key']}")
+        return True
+
+    def run(self, threads: int = 1, exit_when_idle: bool = False, idle_poll: float = 1.0) -> None:
+        """Process jobs on several threads until interrupted or the queue is empty."""
+
+        budget = CpuBudget(threads)
+
+        def loop(worker_id: str) -> None:
+            while True:
+                with budget.allocate():
+                    found = self.process_one(worker_id)
+                if not found:
+                    if exit_when_idle:
+                        return
+                    time.sleep(idle_poll)
+
+        pool = [
+            threading.Thread(target=loop, args=(f"{self.worker_id}/{i}",), daemon=True)
+            for i in range(threads)
+        ]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            while thread.is_alive():
+                thread.join(0.5)
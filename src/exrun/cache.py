@@ -0,0 +1,85 @@
+"""exrun's persistent cache directory.
+
+Tools that cache work between runs (transformed sources, bytecode) are
+pointed at directories under one exrun-managed root instead of writing into
+the course, so the cache survives between runs and across exercises without
+cluttering the working tree or being copied into overlays.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def cache_root() -> Path:
+    """``$EXRUN_CACHE_DIR``, else ``$XDG_CACHE_HOME/exrun``, else ``~/.cache/exrun``."""
+    override = os.environ.get("EXRUN_CACHE_DIR")
+    if override:
+        return Path(override)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return base / "exrun"
+
+
+def _project_key(project_root: Path) -> str:
+    root = project_root.resolve()
+    return f"{root.name}-{hashlib.sha256(str(root).encode()).hexdigest()[:16]}"
+
+
+def project_cache_dir(kind: str, project_root: Path) -> Path:
+    """Cache directory of a given kind for a project, keyed by its resolved root."""
+    path = cache_root() / kind / _project_key(project_root)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on ``path``, which excludes other threads and processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def project_lock(kind: str, project_root: Path) -> Iterator[None]:
+    """Exclusive lock for one kind of work on a project, e.g. installing its packages."""
+    with locked(cache_root() / "locks" / kind / f"{_project_key(project_root)}.lock"):
+        yield
+
+
+def pycache_prefix() -> Path:
+    """Shared PYTHONPYCACHEPREFIX.
+
+    Python mirrors each source's absolute path below the prefix, so one
+    directory serves every project, and bytecode of the tools themselves
+    (pytest, site-packages) is compiled once per host rather than per project.
+    """
+    path = cache_root() / "pycache"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def remove_project_caches(project_root: Path) -> None:
+    """Delete every cache kept for a project, e.g. a temporary tree."""
+    root = project_root.resolve()
+    key = _project_key(root)
+    for kind in cache_root().glob("*"):
+        shutil.rmtree(kind / key, ignore_errors=True)
+    mirror = cache_root() / "pycache" / root.relative_to(root.anchor)
+    shutil.rmtree(mirror, ignore_errors=True)
+    # Temporary trees sit in a directory of their own; drop it if now empty
+    try:
+        mirror.parent.rmdir()
+    except OSError:
+        pass
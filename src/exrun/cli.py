@@ -2,17 +2,17 @@
 
 from __future__ import annotations
 
+import os
+from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Annotated, Optional
+from typing import Annotated, Any, Optional
 
 import typer
 from rich.console import Console
 
+from exrun.commands import do_reset, do_run, do_skip, do_status
 from exrun.runner import ExerciseRunner
 
-if TYPE_CHECKING:
-    from exrun.models import Exercise
-
 app = typer.Typer(
     name="exrun",
     help="Multi-language exercise runner with test gating",
@@ -22,14 +22,67 @@ app = typer.Typer(
 console = Console()
 
 
-def get_runner(exercises_path: Path | None = None) -> ExerciseRunner:
+def _via_daemon(
+    exercises_path: Path | None,
+    command: str,
+    args: dict[str, Any] | None = None,
+    verbose: bool = False,
+) -> int | None:
+    """Forward a command to a running daemon for this course.
+
+    Returns the command's exit code, or None when no daemon is running (or
+    EXRUN_NO_DAEMON is set) and the command should run in-process.
+    """
+    if os.environ.get("EXRUN_NO_DAEMON"):
+        return None
+
+    from exrun.daemon import course_root_for, send_request, socket_path
+
+    course_root = course_root_for(exercises_path)
+    if course_root is None:
+        return None
+    try:
+        path = socket_path(course_root)
+    except RuntimeError as e:
+        console.print(f"[yellow]{e}; running without the daemon.[/yellow]")
+        return None
+    response = send_request(
+        path,
+        command,
+        args,
+        verbose=verbose,
+        color_system=console.color_system,
+        width=console.width,
+    )
+    if response is None:
+        return None
+    console.file.write(response["output"])
+    console.file.flush()
+    exit_code: int = response["exit_code"]
+    return exit_code
+
+
+def get_runner(exercises_path: Path | None = None, verbose: bool = False) -> ExerciseRunner:
     """Create and initialize an exercise runner."""
-    runner = ExerciseRunner(console)
+    runner = ExerciseRunner(console, verbose=verbose)
     if not runner.initialize(exercises_path):
         raise typer.Exit(1)
     return runner
 
 
+def _start_trace(runner: ExerciseRunner, trace: Path | None) -> None:
+    if trace:
+        from exrun.tracing import Tracer
+
+        runner.tracer = Tracer()
+
+
+def _write_trace(runner: ExerciseRunner, trace: Path | None) -> None:
+    if trace and runner.tracer:
+        runner.tracer.write_chrome_trace(trace)
+        console.print(f"[dim]Trace written to {trace} (open in https://ui.perfetto.dev)[/dim]")
+
+
 @app.command()
 def watch(
     keep_going: Annotated[
@@ -40,14 +93,28 @@ def watch(
         Optional[Path],
         typer.Option("--path", "-p", help="Path to exercises directory"),
     ] = None,
+    verbose: Annotated[
+        bool,
+        typer.Option("--verbose", "-v", help="Show timing and resource usage"),
+    ] = False,
+    editor_socket: Annotated[
+        bool,
+        typer.Option("--editor-socket", help="Accept save notifications from editors"),
+    ] = False,
+    trace: Annotated[
+        Optional[Path],
+        typer.Option("--trace", help="Write run phases as Chrome trace-event JSON on exit"),
+    ] = None,
 ) -> None:
     """Start watch mode - rerun tests on file changes."""
     from exrun.watcher import run_watch_mode
 
-    runner = get_runner(exercises_path)
+    runner = get_runner(exercises_path, verbose=verbose)
+    _start_trace(runner, trace)
     try:
-        run_watch_mode(runner, keep_going=keep_going)
+        run_watch_mode(runner, keep_going=keep_going, editor_socket=editor_socket)
     finally:
+        _write_trace(runner, trace)
         runner.close()
 
 
@@ -65,77 +132,39 @@ def run(
         bool,
         typer.Option("--keep-going", "-k", help="Continue through all exercises"),
     ] = False,
+    jobs: Annotated[
+        Optional[int],
+        typer.Option("--jobs", "-j", help="Parallel runs with --recheck (default: CPU count)"),
+    ] = None,
     exercises_path: Annotated[
         Optional[Path],
         typer.Option("--path", "-p", help="Path to exercises directory"),
     ] = None,
+    verbose: Annotated[
+        bool,
+        typer.Option("--verbose", "-v", help="Show timing and resource usage"),
+    ] = False,
+    trace: Annotated[
+        Optional[Path],
+        typer.Option("--trace", help="Write run phases as Chrome trace-event JSON"),
+    ] = None,
 ) -> None:
     """Run tests for an exercise or re-check completed exercises."""
-    runner = get_runner(exercises_path)
-
-    try:
-        if recheck:
-            console.print("[bold]Re-checking previously passed exercises...[/bold]\n")
-            results = runner.recheck_completed()
-
-            all_passed = all(r.passed for _, r in results)
-            if all_passed:
-                console.print(f"\n[green]All {len(results)} exercises still pass![/green]")
-            else:
-                failed = sum(1 for _, r in results if not r.passed)
-                console.print(f"\n[red]{failed} exercise(s) have regressed.[/red]")
-                raise typer.Exit(1)
-
-            if keep_going:
-                current = runner.get_current_exercise()
-                if current:
-                    console.print(f"\n[bold]Continuing from: {current.name}[/bold]")
-                    _run_exercises_sequentially(runner, current)
-            return
-
-        if exercise:
-            ex = runner.get_exercise_by_name(exercise)
-            if not ex:
-                console.print(f"[red]Exercise not found: {exercise}[/red]")
-                raise typer.Exit(1)
-            result = runner.run_exercise(ex)
-            runner.display_result(ex, result)
-            if not result.passed:
-                raise typer.Exit(1)
-        else:
-            current = runner.get_current_exercise()
-            if not current:
-                console.print("[green]All exercises completed![/green]")
-                return
-
-            if keep_going:
-                _run_exercises_sequentially(runner, current)
-            else:
-                result = runner.run_exercise(current)
-                runner.display_result(current, result)
-                if not result.passed:
-                    raise typer.Exit(1)
-
-    finally:
-        runner.close()
-
-
-def _run_exercises_sequentially(runner: ExerciseRunner, start: Exercise) -> None:
-    """Run exercises sequentially starting from a given exercise."""
-    current: Exercise | None = start
-
-    while current:
-        runner.display_problem(current)
-        result = runner.run_exercise(current)
-        runner.display_result(current, result)
-
-        if not result.passed:
-            console.print("\n[yellow]Fix the failing tests to continue.[/yellow]")
-            raise typer.Exit(1)
-
-        current = runner.get_current_exercise()
-
-    console.print("\n[green bold]🎉 All exercises completed![/green bold]")
+    args = {"exercise": exercise, "recheck": recheck, "keep_going": keep_going, "jobs": jobs}
+    # Traces are collected in-process, so --trace bypasses the daemon
+    exit_code = None if trace else _via_daemon(exercises_path, "run", args, verbose=verbose)
+    if exit_code is None:
+        runner = get_runner(exercises_path, verbose=verbose)
+        _start_trace(runner, trace)
+        try:
+            exit_code = do_run(
+                runner, exercise, recheck=recheck, keep_going=keep_going, jobs=jobs
+            )
+        finally:
+            _write_trace(runner, trace)
+            runner.close()
+    if exit_code:
+        raise typer.Exit(exit_code)
 
 
 @app.command()
@@ -146,9 +175,11 @@ def status(
     ] = None,
 ) -> None:
     """Show current progress status."""
+    if _via_daemon(exercises_path, "status") is not None:
+        return
     runner = get_runner(exercises_path)
     try:
-        runner.display_status()
+        do_status(runner)
     finally:
         runner.close()
 
@@ -169,15 +200,16 @@ def reset(
     ] = False,
 ) -> None:
     """Reset progress for one or all exercises."""
-    runner = get_runner(exercises_path)
+    if not force:
+        target = exercise or "all exercises"
+        if not typer.confirm(f"Reset progress for {target}?"):
+            raise typer.Abort()
 
+    if _via_daemon(exercises_path, "reset", {"exercise": exercise}) is not None:
+        return
+    runner = get_runner(exercises_path)
     try:
-        if not force:
-            target = exercise or "all exercises"
-            if not typer.confirm(f"Reset progress for {target}?"):
-                raise typer.Abort()
-
-        runner.reset(exercise)
+        do_reset(runner, exercise)
     finally:
         runner.close()
 
@@ -190,15 +222,11 @@ def skip(
     ] = None,
 ) -> None:
     """Skip the current exercise."""
+    if _via_daemon(exercises_path, "skip") is not None:
+        return
     runner = get_runner(exercises_path)
-
     try:
-        next_ex = runner.skip_current()
-        if next_ex:
-            console.print(f"[bold]Next exercise: {next_ex.name}[/bold]")
-            runner.display_problem(next_ex)
-        else:
-            console.print("[green]All exercises completed![/green]")
+        do_skip(runner)
     finally:
         runner.close()
 
@@ -218,6 +246,230 @@ def list_exercises(
         runner.close()
 
 
+@app.command()
+def perf(
+    watch_latency: Annotated[
+        bool,
+        typer.Option("--watch", help="Save-to-result latency of watch mode"),
+    ] = False,
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Path to exercises directory"),
+    ] = None,
+) -> None:
+    """Show performance statistics recorded for this course."""
+    from exrun.latency import latency_table
+
+    if not watch_latency:
+        console.print("Use --watch to show watch-mode latency.")
+        return
+
+    runner = get_runner(exercises_path)
+    try:
+        histograms = runner.progress_db.get_latencies()
+    finally:
+        runner.close()
+    if not histograms:
+        console.print("[dim]No watch-mode runs recorded yet.[/dim]")
+        return
+    console.print(latency_table("Save-to-result latency (all sessions)", histograms))
+
+
+@app.command()
+def metrics(
+    output: Annotated[
+        Path,
+        typer.Option("--output", "-o", help="OpenMetrics file to write (e.g. for node_exporter)"),
+    ],
+    databases: Annotated[
+        Optional[list[Path]],
+        typer.Option("--db", help="progress.db files or directories to search (repeatable)"),
+    ] = None,
+    broker_dir: Annotated[
+        Optional[Path],
+        typer.Option("--broker", help="Also report the queue depth of a grading broker"),
+    ] = None,
+    interval: Annotated[
+        Optional[int],
+        typer.Option("--interval", help="Rewrite the file every N seconds instead of once"),
+    ] = None,
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Course to read when --db is not given"),
+    ] = None,
+) -> None:
+    """Export run counts, durations and queue depth as an OpenMetrics text file."""
+    import time
+
+    from exrun.daemon import course_root_for
+    from exrun.metrics import collect, render, write_textfile
+    from exrun.progress import find_progress_dbs
+
+    if not databases:
+        course_root = course_root_for(exercises_path)
+        if course_root is None:
+            console.print("[red]No course found; pass --db or --path.[/red]")
+            raise typer.Exit(1)
+        databases = [course_root / "progress.db"]
+
+    try:
+        while True:
+            db_paths = find_progress_dbs(databases)
+            write_textfile(output, render(collect(db_paths, broker_dir)))
+            if interval is None:
+                console.print(f"[green]Wrote {output} from {len(db_paths)} database(s)[/green]")
+                return
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def export(
+    output: Annotated[
+        Path,
+        typer.Argument(help="File to write (.parquet, or .arrow for Arrow IPC)"),
+    ],
+    databases: Annotated[
+        Optional[list[Path]],
+        typer.Option("--db", help="progress.db files or directories to search (repeatable)"),
+    ] = None,
+    table: Annotated[
+        str,
+        typer.Option("--table", help="attempts or exercises"),
+    ] = "attempts",
+    output_format: Annotated[
+        Optional[str],
+        typer.Option("--format", help="parquet or arrow (default: from the file extension)"),
+    ] = None,
+    course: Annotated[
+        Optional[str],
+        typer.Option("--course", help="Only databases of this course (its exrun.toml name)"),
+    ] = None,
+    exercise: Annotated[
+        Optional[str],
+        typer.Option("--exercise", help="Only this exercise"),
+    ] = None,
+    since: Annotated[
+        Optional[datetime],
+        typer.Option("--since", help="Only attempts at or after this time (local time)"),
+    ] = None,
+    until: Annotated[
+        Optional[datetime],
+        typer.Option("--until", help="Only attempts before this time (local time)"),
+    ] = None,
+    include_output: Annotated[
+        bool,
+        typer.Option("--include-output", help="Also export each run's captured output"),
+    ] = False,
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Course to read when --db is not given"),
+    ] = None,
+) -> None:
+    """Export attempt history to Parquet or Arrow IPC for analytics."""
+    try:
+        from exrun.export import FORMATS
+        from exrun.export import export as export_table
+    except ImportError:
+        console.print("[red]Export needs pyarrow: install exrun[export].[/red]")
+        raise typer.Exit(1) from None
+    from exrun.daemon import course_root_for
+    from exrun.progress import find_progress_dbs
+
+    if output_format is None:
+        output_format = "arrow" if output.suffix in (".arrow", ".feather") else "parquet"
+    if output_format not in FORMATS:
+        console.print(f"[red]Unknown format: {output_format}[/red]")
+        raise typer.Exit(1)
+    if table not in ("attempts", "exercises"):
+        console.print(f"[red]Unknown table: {table}[/red]")
+        raise typer.Exit(1)
+
+    if not databases:
+        course_root = course_root_for(exercises_path)
+        if course_root is None:
+            console.print("[red]No course found; pass --db or --path.[/red]")
+            raise typer.Exit(1)
+        databases = [course_root / "progress.db"]
+
+    db_paths = find_progress_dbs(databases)
+    rows = export_table(
+        db_paths,
+        output,
+        table=table,
+        output_format=output_format,
+        course=course,
+        exercise=exercise,
+        since=since,
+        until=until,
+        include_output=include_output,
+    )
+    console.print(
+        f"[green]Wrote {rows} row(s) from {len(db_paths)} database(s) to {output}[/green]"
+    )
+
+
+@app.command()
+def aggregate(
+    warehouse_path: Annotated[
+        Path,
+        typer.Argument(help="Warehouse SQLite file (created if missing)"),
+    ],
+    databases: Annotated[
+        Optional[list[Path]],
+        typer.Option("--db", help="progress.db files or directories to search (repeatable)"),
+    ] = None,
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Course to read when --db is not given"),
+    ] = None,
+) -> None:
+    """Import new attempts from progress databases into a warehouse database."""
+    from exrun.daemon import course_root_for
+    from exrun.progress import find_progress_dbs
+    from exrun.warehouse import Warehouse
+
+    if not databases:
+        course_root = course_root_for(exercises_path)
+        if course_root is None:
+            console.print("[red]No course found; pass --db or --path.[/red]")
+            raise typer.Exit(1)
+        databases = [course_root / "progress.db"]
+
+    warehouse = Warehouse(warehouse_path)
+    try:
+        stats = warehouse.ingest(find_progress_dbs(databases))
+    finally:
+        warehouse.close()
+    summary = f"Imported {stats.attempts} new attempt(s) from {stats.sources} database(s)"
+    if stats.unchanged:
+        summary += f", {stats.unchanged} unchanged"
+    if stats.reset:
+        summary += f", {stats.reset} re-imported after a reset"
+    console.print(f"[green]{summary}[/green]")
+
+
+@app.command()
+def prepare(
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Path to exercises directory"),
+    ] = None,
+    jobs: Annotated[
+        Optional[int],
+        typer.Option("--jobs", "-j", help="Environments to build at once (default: CPU count)"),
+    ] = None,
+) -> None:
+    """Build cached environments ahead of time, so first runs start fast."""
+    runner = get_runner(exercises_path)
+    try:
+        if not runner.prepare(workers=jobs):
+            raise typer.Exit(1)
+    finally:
+        runner.close()
+
+
 @app.command()
 def verify(
     all_exercises: Annotated[
@@ -228,23 +480,212 @@ def verify(
         Optional[Path],
         typer.Option("--path", "-p", help="Path to exercises directory"),
     ] = None,
+    solutions_dir: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--solutions",
+            help="Reference solutions: starters must fail and solutions must pass",
+        ),
+    ] = None,
+    jobs: Annotated[
+        Optional[int],
+        typer.Option("--jobs", "-j", help="Number of parallel runs (default: CPU count)"),
+    ] = None,
 ) -> None:
     """Verify exercises (for course authors)."""
     runner = get_runner(exercises_path)
 
     try:
-        if all_exercises:
+        if solutions_dir:
+            if not solutions_dir.is_dir():
+                console.print(f"[red]Solutions directory not found: {solutions_dir}[/red]")
+                raise typer.Exit(1)
+            console.print("[bold]Verifying starters and reference solutions...[/bold]\n")
+            if runner.verify_solutions(solutions_dir, workers=jobs):
+                console.print("\n[green]All exercises verified![/green]")
+            else:
+                console.print("\n[red]Some exercises failed verification.[/red]")
+                raise typer.Exit(1)
+        elif all_exercises:
             console.print("[bold]Verifying all exercises...[/bold]\n")
-            if runner.verify_all():
+            if runner.verify_all(workers=jobs):
                 console.print("\n[green]All exercises verified![/green]")
             else:
                 console.print("\n[red]Some exercises failed verification.[/red]")
                 raise typer.Exit(1)
         else:
-            console.print("Use --all to verify all exercises.")
+            console.print("Use --all or --solutions DIR to verify all exercises.")
+    finally:
+        runner.close()
+
+
+@app.command()
+def grade(
+    submissions_dir: Annotated[
+        Path,
+        typer.Argument(help="Directory with one copy of the course per student"),
+    ],
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Path to the reference course"),
+    ] = None,
+    jobs: Annotated[
+        Optional[int],
+        typer.Option("--jobs", "-j", help="Number of parallel workers (default: CPU count)"),
+    ] = None,
+    report: Annotated[
+        Path,
+        typer.Option("--report", "-o", help="Where to write the JSON report"),
+    ] = Path("grades.json"),
+    csv_report: Annotated[
+        Optional[Path],
+        typer.Option("--csv", help="Also write a CSV report"),
+    ] = None,
+    record_progress: Annotated[
+        bool,
+        typer.Option(
+            "--record-progress/--no-record-progress",
+            help="Record attempts in each student's progress.db",
+        ),
+    ] = True,
+    broker_dir: Annotated[
+        Optional[Path],
+        typer.Option("--broker", help="Queue jobs in a shared broker directory for `exrun worker`"),
+    ] = None,
+) -> None:
+    """Grade every student's copy of a course (for instructors)."""
+    from exrun.grading import (
+        Grader,
+        ProgressRecorder,
+        discover_submissions,
+        write_csv_report,
+        write_json_report,
+    )
+
+    if not submissions_dir.is_dir():
+        console.print(f"[red]Submissions directory not found: {submissions_dir}[/red]")
+        raise typer.Exit(1)
+
+    runner = get_runner(exercises_path)
+    try:
+        submissions = discover_submissions(submissions_dir)
+        grader = Grader(runner.course_config, runner.exercises, console, workers=jobs)
+        if broker_dir:
+            from exrun.broker import JobBroker, grade_via_broker
+
+            console.print(
+                f"[bold]Queueing {len(submissions)} submission(s) × "
+                f"{len(runner.exercises)} exercise(s) in {broker_dir}...[/bold]"
+            )
+            broker = JobBroker(broker_dir)
+            try:
+                outcomes = grade_via_broker(grader, broker, submissions)
+            finally:
+                broker.close()
+            if record_progress:
+                recorder = ProgressRecorder(grader, submissions)
+                try:
+                    for outcome in outcomes:
+                        recorder.record(outcome)
+                finally:
+                    recorder.close()
+        else:
+            console.print(
+                f"[bold]Grading {len(submissions)} submission(s) × "
+                f"{len(runner.exercises)} exercise(s) with {grader.workers} worker(s)...[/bold]"
+            )
+            outcomes = grader.grade(submissions, record_progress=record_progress)
     finally:
         runner.close()
 
+    write_json_report(report, runner.course_config, outcomes)
+    console.print(f"[green]Wrote {report}[/green]")
+    if csv_report:
+        write_csv_report(csv_report, outcomes)
+        console.print(f"[green]Wrote {csv_report}[/green]")
+
+    passed = sum(1 for o in outcomes if o.result.passed)
+    console.print(f"\n{passed}/{len(outcomes)} exercise submissions passed.")
+
+
+@app.command()
+def worker(
+    broker_dir: Annotated[
+        Path,
+        typer.Option("--broker", help="Shared broker directory used by `exrun grade --broker`"),
+    ],
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="Number of jobs to run at once"),
+    ] = 1,
+    lease_seconds: Annotated[
+        int,
+        typer.Option("--lease-seconds", help="How long a job stays assigned without a heartbeat"),
+    ] = 60,
+    exit_when_idle: Annotated[
+        bool,
+        typer.Option("--exit-when-idle", help="Exit once the queue is empty"),
+    ] = False,
+) -> None:
+    """Run grading jobs queued in a shared broker directory."""
+    from exrun.broker import GradingWorker, JobBroker
+
+    broker = JobBroker(broker_dir)
+    grading_worker = GradingWorker(broker, console, lease_seconds=lease_seconds)
+    console.print(f"[dim]Worker {grading_worker.worker_id} polling {broker_dir}[/dim]")
+    try:
+        grading_worker.run(threads=jobs, exit_when_idle=exit_when_idle)
+    except KeyboardInterrupt:
+        console.print("\n[dim]Worker stopped.[/dim]")
+    finally:
+        broker.close()
+
+
+@app.command()
+def daemon(
+    exercises_path: Annotated[
+        Optional[Path],
+        typer.Option("--path", "-p", help="Path to exercises directory"),
+    ] = None,
+    stop: Annotated[
+        bool,
+        typer.Option("--stop", help="Stop the daemon running for this course"),
+    ] = False,
+) -> None:
+    """Keep a runner resident and serve run/status/skip/reset over a socket."""
+    from exrun.daemon import ExerciseDaemon, course_root_for, send_request, serve, socket_path
+
+    course_root = course_root_for(exercises_path)
+    if course_root is None:
+        console.print("[red]No exrun.toml found and current directory is not an exercise course.[/red]")
+        raise typer.Exit(1)
+    try:
+        path = socket_path(course_root)
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1) from e
+
+    if stop:
+        if send_request(path, "shutdown") is None:
+            console.print("[yellow]No daemon is running for this course.[/yellow]")
+            raise typer.Exit(1)
+        console.print("[green]Daemon stopped.[/green]")
+        return
+
+    runner = get_runner(exercises_path)
+    console.print(f"[dim]exrun daemon listening on {path}[/dim]")
+    console.print("[dim]Press Ctrl+C to stop.[/dim]")
+    daemon = ExerciseDaemon(runner, exercises_path)
+    try:
+        serve(daemon, path)
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1) from e
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.runner.close()  # The runner it was last reloaded into
+
 
 @app.command()
 def init(
@@ -0,0 +1,107 @@
+"""Command implementations shared by the CLI and the daemon.
+
+Each command prints through the runner's console and returns an exit code,
+so the same flow can run in-process or inside ``exrun daemon``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from exrun.models import Exercise
+    from exrun.runner import ExerciseRunner
+
+
+def do_run(
+    runner: ExerciseRunner,
+    exercise: str | None = None,
+    recheck: bool = False,
+    keep_going: bool = False,
+    jobs: int | None = None,
+) -> int:
+    """Run one exercise, the current exercise, or re-check completed ones."""
+    console = runner.console
+
+    if recheck:
+        console.print("[bold]Re-checking previously passed exercises...[/bold]\n")
+        results = runner.recheck_completed(workers=jobs)
+
+        all_passed = all(r.passed for _, r in results)
+        if all_passed:
+            console.print(f"\n[green]All {len(results)} exercises still pass![/green]")
+        else:
+            failed = sum(1 for _, r in results if not r.passed)
+            console.print(f"\n[red]{failed} exercise(s) have regressed.[/red]")
+            return 1
+
+        if keep_going:
+            current = runner.get_current_exercise()
+            if current:
+                console.print(f"\n[bold]Continuing from: {current.name}[/bold]")
+                return run_sequentially(runner, current)
+        return 0
+
+    if exercise:
+        ex = runner.get_exercise_by_name(exercise)
+        if not ex:
+            console.print(f"[red]Exercise not found: {exercise}[/red]")
+            return 1
+        result = runner.run_exercise(ex)
+        runner.display_result(ex, result)
+        return 0 if result.passed else 1
+
+    current = runner.get_current_exercise()
+    if not current:
+        console.print("[green]All exercises completed![/green]")
+        return 0
+
+    if keep_going:
+        return run_sequentially(runner, current)
+
+    result = runner.run_exercise(current)
+    runner.display_result(current, result)
+    return 0 if result.passed else 1
+
+
+def run_sequentially(runner: ExerciseRunner, start: Exercise) -> int:
+    """Run exercises sequentially starting from a given exercise."""
+    console = runner.console
+    current: Exercise | None = start
+
+    while current:
+        runner.display_problem(current)
+        result = runner.run_exercise(current)
+        runner.display_result(current, result)
+
+        if not result.passed:
+            console.print("\n[yellow]Fix the failing tests to continue.[/yellow]")
+            return 1
+
+        current = runner.get_current_exercise()
+
+    console.print("\n[green bold]🎉 All exercises completed![/green bold]")
+    return 0
+
+
+def do_status(runner: ExerciseRunner) -> int:
+    """Show current progress status."""
+    runner.display_status()
+    return 0
+
+
+def do_reset(runner: ExerciseRunner, exercise: str | None = None) -> int:
+    """Reset progress for one or all exercises."""
+    runner.reset(exercise)
+    return 0
+
+
+def do_skip(runner: ExerciseRunner) -> int:
+    """Skip the current exercise and show the next one."""
+    next_ex = runner.skip_current()
+    if next_ex:
+        runner.console.print(f"[bold]Next exercise: {next_ex.name}[/bold]")
+        runner.display_problem(next_ex)
+    else:
+        runner.console.print("[green]All exercises completed![/green]")
+    return 0
@@ -0,0 +1,129 @@
+"""CPU accounting for test runs.
+
+A test run may use the cores of the machine, or of its cgroup quota or CPU
+affinity mask. When exrun runs several tests at once (verification, grading,
+broker workers), a ``CpuBudget`` hands each run an allocation of cores as it
+starts, set in a context variable of the thread doing the run. Adapters pass
+the allocation to test tools as worker counts and thread pool sizes, so runs
+side by side do not each start a pool per core.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+_run_cpus: ContextVar[int | None] = ContextVar("exrun_run_cpus", default=None)
+
+
+def available_cpus() -> int:
+    """Cores this process may use: its affinity mask, capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+def run_cpus() -> int:
+    """Cores the current test run may use."""
+    allocation = _run_cpus.get()
+    return allocation if allocation is not None else available_cpus()
+
+
+def allocated_cpus() -> int | None:
+    """Cores allocated to the current run by a budget, or None outside one."""
+    return _run_cpus.get()
+
+
+class CpuBudget:
+    """Divides the available cores among runs executing at once.
+
+    A run starting while others hold their allocations gets an even share of
+    the free cores among itself and the runs that may still start beside it:
+    idle pool slots, but no more than the jobs left, when they are known. Runs
+    near the end of a batch therefore get the cores earlier runs released.
+    """
+
+    def __init__(self, parallel_runs: int, jobs: int | None = None, cpus: int | None = None):
+        self.cpus = cpus or available_cpus()
+        self._slots = max(1, parallel_runs)
+        self._pending = jobs
+        self._running = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    def _take(self) -> int:
+        with self._lock:
+            if self._pending is not None:
+                self._pending = max(0, self._pending - 1)
+            starting = max(0, self._slots - self._running - 1)
+            if self._pending is not None:
+                starting = min(starting, self._pending)
+            cpus = max(1, (self.cpus - self._in_use) // (starting + 1))
+            self._running += 1
+            self._in_use += cpus
+            return cpus
+
+    def _release(self, cpus: int) -> None:
+        with self._lock:
+            self._running -= 1
+            self._in_use -= cpus
+
+    @contextmanager
+    def allocate(self) -> Iterator[int]:
+        """Hold an allocation for the run executed in this context."""
+        cpus = self._take()
+        token = _run_cpus.set(cpus)
+        try:
+            yield cpus
+        finally:
+            _run_cpus.reset(token)
+            self._release(cpus)
+
+
+def thread_env() -> dict[str, str]:
+    """Thread pool sizes for the current run's allocation, for test processes.
+
+    OpenMP sizes PyTorch's intra-op pool as well as its own, and the BLAS
+    libraries NumPy links against read their own variable. Empty outside a
+    budget, so a lone run keeps the libraries' defaults.
+    """
+    cpus = allocated_cpus()
+    if cpus is None:
+        return {}
+    value = str(cpus)
+    return {
+        "EXRUN_CPUS": value,
+        "OMP_NUM_THREADS": value,
+        "MKL_NUM_THREADS": value,
+        "OPENBLAS_NUM_THREADS": value,
+        "VITEST_MAX_THREADS": value,
+        "VITEST_MAX_FORKS": value,
+    }
+
+
+def test_workers(setting: int | str | None) -> int | None:
+    """Workers a test tool should use inside one run, or None for the tool's default.
+
+    ``setting`` is the ``test_workers`` setting: a number of workers, capped
+    by the run's allocation, or ``"auto"`` for the whole allocation. Unset, a
+    run under a budget still caps the tool's pool at its allocation.
+    """
+    if setting is None:
+        return allocated_cpus()
+    cpus = run_cpus()
+    if setting == "auto":
+        return cpus
+    return max(1, min(int(setting), cpus))
@@ -0,0 +1,246 @@
+"""Resident exrun daemon serving commands over a Unix socket.
+
+The daemon keeps an initialized ExerciseRunner (exercise index, adapters and
+the progress database connection) alive between invocations. Clients send a
+single JSON line per connection::
+
+    {"command": "run", "args": {"exercise": "01_hello"}, "verbose": false,
+     "color_system": "truecolor", "width": 120}
+
+and receive a single JSON line with the rendered output and exit code::
+
+    {"output": "...", "exit_code": 0}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+
+from exrun.commands import do_reset, do_run, do_skip, do_status
+from exrun.exercise import is_exercise_dir
+from exrun.runner import ExerciseRunner, resolve_course_config
+
+
+def _socket_dir() -> Path:
+    """The directory holding exrun's sockets, created private to this user.
+
+    Without XDG_RUNTIME_DIR it lives in the shared temporary directory, where
+    another user could create it first and plant sockets, so a directory not
+    owned by this user or writable by others raises RuntimeError.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        base = Path(runtime_dir) / "exrun"
+    else:
+        base = Path(tempfile.gettempdir()) / f"exrun-{os.getuid()}"
+    base.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = base.lstat()
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise RuntimeError(
+            f"Refusing to use {base} for sockets: it must be a directory owned by you "
+            "and writable only by you"
+        )
+    return base
+
+
+def socket_path(course_root: Path, kind: str = "daemon") -> Path:
+    """Get the socket path of a given kind for a course, keyed by its resolved root.
+
+    Raises RuntimeError if the socket directory is not private to this user.
+    """
+    base = _socket_dir()
+    digest = hashlib.sha256(str(course_root.resolve()).encode()).hexdigest()[:16]
+    return base / f"{digest}-{kind}.sock"
+
+
+def course_root_for(exercises_path: Path | None) -> Path | None:
+    """Find the course root (where progress.db lives) for a CLI invocation."""
+    course_config = resolve_course_config(exercises_path)
+    if course_config is None:
+        return None
+    return course_config.exercises_path.parent
+
+
+def _stat_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class ExerciseDaemon:
+    """Dispatches client requests to a resident ExerciseRunner."""
+
+    def __init__(self, runner: ExerciseRunner, exercises_path: Path | None = None):
+        self.runner = runner
+        self.exercises_path = exercises_path
+        self.shutdown_requested = False
+        self._commands: dict[str, Callable[[dict[str, Any]], int]] = {
+            "run": lambda args: do_run(
+                self.runner,
+                args.get("exercise"),
+                recheck=args.get("recheck", False),
+                keep_going=args.get("keep_going", False),
+                jobs=args.get("jobs"),
+            ),
+            "status": lambda args: do_status(self.runner),
+            "skip": lambda args: do_skip(self.runner),
+            "reset": lambda args: do_reset(self.runner, args.get("exercise")),
+            "ping": lambda args: 0,
+            "shutdown": self._shutdown,
+        }
+        self._mtimes = self._watched_mtimes()
+
+    def _watched_mtimes(self) -> dict[Path, float]:
+        """Modification times that invalidate the exercise index.
+
+        Those of exrun.toml, of every directory discovery lists (so exercises
+        added or renamed at any depth are seen) and of exercise.toml files.
+        """
+        exercises_path = self.runner.course_config.exercises_path
+        config_path = exercises_path.parent / "exrun.toml"
+        mtimes = {config_path: _stat_mtime(config_path)}
+        for dirpath, dirnames, _ in os.walk(exercises_path):
+            directory = Path(dirpath)
+            mtimes[directory] = _stat_mtime(directory)
+            if is_exercise_dir(directory) and directory != exercises_path:
+                mtimes[directory / "exercise.toml"] = _stat_mtime(directory / "exercise.toml")
+                dirnames[:] = []  # Student files do not change the index
+            else:
+                dirnames[:] = [
+                    name for name in dirnames
+                    if not name.startswith((".", "_")) and name != "node_modules"
+                ]
+        return mtimes
+
+    def _refresh_if_stale(self) -> None:
+        """Reload config and exercises if exrun.toml or the exercise tree changed.
+
+        The reloaded runner replaces the current one only once it initialized,
+        so a broken exrun.toml fails requests until fixed rather than leaving
+        the daemon without a runner.
+        """
+        mtimes = self._watched_mtimes()
+        if mtimes == self._mtimes:
+            return
+        runner = ExerciseRunner(self.runner.console, self.runner.verbose)
+        if not runner.initialize(self.exercises_path):
+            runner.close()
+            raise RuntimeError("reloading the course failed; fix it and retry")
+        self.runner.close()
+        self.runner = runner
+        self._mtimes = mtimes
+
+    def _shutdown(self, args: dict[str, Any]) -> int:
+        self.shutdown_requested = True
+        self.runner.console.print("[dim]Daemon stopping.[/dim]")
+        return 0
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Execute one request, capturing everything the runner prints."""
+        buffer = io.StringIO()
+        color_system = request.get("color_system")
+        self.runner.console = Console(
+            file=buffer,
+            force_terminal=color_system is not None,
+            color_system=color_system,
+            width=request.get("width") or 80,
+        )
+        self.runner.verbose = bool(request.get("verbose", False))
+
+        command = self._commands.get(request.get("command", ""))
+        if command is None:
+            self.runner.console.print(f"[red]Unknown command: {request.get('command')}[/red]")
+            return {"output": buffer.getvalue(), "exit_code": 2}
+
+        try:
+            self._refresh_if_stale()
+            exit_code = command(request.get("args", {}))
+        except Exception as e:
+            self.runner.console.print(f"[red]Daemon error: {e}[/red]")
+            exit_code = 1
+        return {"output": buffer.getvalue(), "exit_code": exit_code}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: _DaemonServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            response = {"output": "Malformed request\n", "exit_code": 2}
+        else:
+            response = self.server.daemon.handle(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _DaemonServer(socketserver.UnixStreamServer):
+    def __init__(self, path: Path, daemon: ExerciseDaemon):
+        self.daemon = daemon
+        super().__init__(str(path), _RequestHandler)
+
+
+def serve(daemon: ExerciseDaemon, path: Path) -> None:
+    """Serve requests on a Unix socket until a shutdown request arrives."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if path.exists():
+        if send_request(path, "ping") is not None:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        path.unlink()  # Stale socket from a daemon that did not exit cleanly
+
+    server = _DaemonServer(path, daemon)
+    try:
+        # Requests are handled one at a time, so the runner needs no locking
+        while not daemon.shutdown_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def send_request(
+    path: Path,
+    command: str,
+    args: dict[str, Any] | None = None,
+    verbose: bool = False,
+    color_system: str | None = None,
+    width: int | None = None,
+) -> dict[str, Any] | None:
+    """Send one request to a daemon. Returns None if no daemon is listening."""
+    if not path.exists():
+        return None
+    request = {
+        "command": command,
+        "args": args or {},
+        "verbose": verbose,
+        "color_system": color_system,
+        "width": width,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+    if not line:
+        return None
+    response: dict[str, Any] = json.loads(line)
+    return response
@@ -0,0 +1,138 @@
+"""Cached Python environments for exercises that declare requirements.
+
+Requirements are resolved with ``uv pip compile`` into a lock file, and a
+virtual environment is built with uv for each distinct lock. Environments
+live under the exrun cache directory, keyed by a hash of the interpreter and
+the resolved requirements, so every exercise, course and student on the host
+that resolves to the same packages shares one environment. A file lock makes
+concurrent builders (``exrun prepare`` threads, graders, other processes)
+wait for a single build instead of racing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from exrun.cache import cache_root, locked
+from exrun.models import Exercise
+
+_READY_MARKER = ".exrun-ready"
+
+# Installed into every environment, since exercises are tested with it
+_ALWAYS_REQUIRED = ("pytest",)
+
+
+@dataclass(frozen=True)
+class PythonEnv:
+    path: Path
+
+    @property
+    def python(self) -> Path:
+        return self.path / "bin" / "python"
+
+    @property
+    def ready(self) -> bool:
+        return (self.path / _READY_MARKER).exists()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def _normalize(requirements: Iterable[str]) -> list[str]:
+    declared = {line.strip() for line in requirements if line.strip()}
+    names = {_project_name(line) for line in declared}
+    declared.update(name for name in _ALWAYS_REQUIRED if name not in names)
+    return sorted(declared)
+
+
+def _project_name(requirement: str) -> str:
+    for index, char in enumerate(requirement):
+        if not (char.isalnum() or char in "-_."):
+            return requirement[:index].lower()
+    return requirement.lower()
+
+
+def _uv() -> str:
+    uv = shutil.which("uv")
+    if uv is None:
+        raise RuntimeError("uv is needed to build environments for exercise requirements")
+    return uv
+
+
+def _run(args: list[str]) -> None:
+    proc = subprocess.run(args, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args[:3])} failed:\n{proc.stderr.strip()}")
+
+
+def _resolve(requirements: list[str], python: str) -> str:
+    """Pinned requirements for a declared set, compiled once and then reused."""
+    locks = cache_root() / "python-envs" / "locks"
+    key = _digest(python, *requirements)
+    lock_path = locks / f"{key}.txt"
+    if lock_path.exists():
+        return lock_path.read_text()
+    with locked(locks / f"{key}.lock"):
+        if not lock_path.exists():
+            source = locks / f"{key}.in"
+            source.write_text("\n".join(requirements) + "\n")
+            tmp = locks / f".{key}.{os.getpid()}.txt"
+            _run([
+                _uv(), "pip", "compile", str(source),
+                "--python", python, "--no-header", "--quiet", "-o", str(tmp),
+            ])
+            os.replace(tmp, lock_path)
+    return lock_path.read_text()
+
+
+def exercise_requirements(exercise: Exercise) -> tuple[str, ...]:
+    """Requirements of an exercise's environment: its own, plus xdist to run tests in parallel."""
+    requirements = exercise.config.requirements
+    if requirements and exercise.config.test_workers is not None:
+        requirements += ("pytest-xdist",)
+    return requirements
+
+
+def environment_for(requirements: Iterable[str], python: str | None = None) -> PythonEnv:
+    """Return the environment for a set of requirements, building it if needed."""
+    python = python or sys.executable
+    pinned = _resolve(_normalize(requirements), python)
+    key = _digest(python, pinned)
+    env = PythonEnv(cache_root() / "python-envs" / key)
+    if env.ready:
+        return env
+
+    with locked(env.path.with_name(f"{key}.lock")):
+        if env.ready:
+            return env
+        # A build interrupted earlier leaves a directory without the marker
+        shutil.rmtree(env.path, ignore_errors=True)
+        uv = _uv()
+        _run([uv, "venv", str(env.path), "--python", python, "--quiet"])
+        pinned_path = env.path / "requirements.txt"
+        pinned_path.write_text(pinned)
+        _run([
+            uv, "pip", "install", "--python", str(env.python),
+            "-r", str(pinned_path), "--quiet",
+        ])
+        (env.path / _READY_MARKER).touch()
+    return env
+
+
+def is_prepared(requirements: Iterable[str], python: str | None = None) -> bool:
+    """Whether the environment for a set of requirements is already built."""
+    python = python or sys.executable
+    requirements = _normalize(requirements)
+    lock_path = cache_root() / "python-envs" / "locks" / f"{_digest(python, *requirements)}.txt"
+    if not lock_path.exists():
+        return False
+    key = _digest(python, lock_path.read_text())
+    return PythonEnv(cache_root() / "python-envs" / key).ready
@@ -2,9 +2,26 @@
 
 import re
 import tomllib
+from dataclasses import fields, replace
 from pathlib import Path
-
-from exrun.models import CourseConfig, Exercise, ExerciseConfig
+from typing import Any
+
+from exrun.models import (
+    AdaptiveTimeout,
+    CourseConfig,
+    Exercise,
+    ExerciseConfig,
+    ResourceLimits,
+)
+
+# [settings] keys for the adaptive timeout policy
+_ADAPTIVE_TIMEOUT_KEYS = {
+    "adaptive_timeout": "enabled",
+    "timeout_multiplier": "multiplier",
+    "timeout_floor_seconds": "floor_seconds",
+    "timeout_ceiling_seconds": "ceiling_seconds",
+    "timeout_min_samples": "min_samples",
+}
 
 
 def find_config_file(start_path: Path | None = None) -> Path | None:
@@ -30,6 +47,26 @@ def find_config_file(start_path: Path | None = None) -> Path | None:
     return None
 
 
+def _parse_test_workers(value: object, source: Path) -> int | str | None:
+    """Check a ``test_workers`` setting: a positive number of workers or ``"auto"``."""
+    if value is None or value == "auto":
+        return value
+    if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+        return value
+    raise ValueError(f'{source}: test_workers must be a positive integer or "auto", not {value!r}')
+
+
+def find_project_root(exercise: Exercise, marker: str = "package.json") -> Path:
+    """Nearest directory at or above an exercise containing ``marker``.
+
+    Falls back to the exercise's own directory when no ancestor has it.
+    """
+    for directory in (exercise.path, *exercise.path.parents):
+        if (directory / marker).exists():
+            return directory
+    return exercise.path
+
+
 def load_course_config(config_path: Path) -> CourseConfig:
     """Load course configuration from exrun.toml.
 
@@ -57,11 +94,43 @@ def load_course_config(config_path: Path) -> CourseConfig:
         exercises_path=exercises_path.resolve(),
         version=course.get("version", "1.0.0"),
         language=course.get("language", "python"),
-        test_runner=course.get("test_runner", "pytest"),
+        test_runner=course.get("test_runner"),
         timeout_seconds=settings.get("timeout_seconds", 30),
+        limits=_parse_limits(settings, ResourceLimits()),
+        adaptive_timeout=_parse_adaptive_timeout(settings, AdaptiveTimeout()),
+        requirements=tuple(settings.get("requirements", ())),
+        test_workers=_parse_test_workers(settings.get("test_workers"), config_path),
     )
 
 
+def _parse_limits(settings: dict[str, Any], defaults: ResourceLimits) -> ResourceLimits:
+    """Read resource limit keys from a [settings] table on top of defaults."""
+    overrides = {
+        f.name: settings[f.name] for f in fields(ResourceLimits) if f.name in settings
+    }
+    return replace(defaults, **overrides)
+
+
+def _parse_adaptive_timeout(
+    settings: dict[str, Any], defaults: AdaptiveTimeout
+) -> AdaptiveTimeout:
+    """Read adaptive timeout keys from a [settings] table on top of defaults."""
+    overrides = {
+        attr: settings[key] for key, attr in _ADAPTIVE_TIMEOUT_KEYS.items() if key in settings
+    }
+    return replace(defaults, **overrides)
+
+
+def _load_exercise_settings(exercise_path: Path) -> dict[str, Any]:
+    """Load the optional [settings] table from an exercise's exercise.toml."""
+    exercise_toml = exercise_path / "exercise.toml"
+    if not exercise_toml.exists():
+        return {}
+    with open(exercise_toml, "rb") as f:
+        settings: dict[str, Any] = tomllib.load(f).get("settings", {})
+    return settings
+
+
 def _extract_order_from_name(name: str) -> int:
     """Extract order number from exercise directory name.
 
@@ -123,6 +192,7 @@ def load_exercise(
     - Directory name for order and display name
     - problem.md for description
     - Course defaults for timeout, language, etc.
+    - An optional exercise.toml whose [settings] override course settings
     """
     # Get hierarchical order from directory structure
     order = _get_hierarchical_order(exercise_path, exercises_root)
@@ -130,11 +200,24 @@ def load_exercise(
     # Name from directory
     name = _format_exercise_name(exercise_path.name)
 
-    # Build config from directory info and course defaults
+    # Build config from directory info, course defaults and exercise overrides
+    settings = _load_exercise_settings(exercise_path)
+    adaptive_timeout = _parse_adaptive_timeout(settings, course_config.adaptive_timeout)
+    if "timeout_seconds" in settings and "adaptive_timeout" not in settings:
+        # An explicit per-exercise timeout wins over the derived one
+        adaptive_timeout = replace(adaptive_timeout, enabled=False)
+
     config = ExerciseConfig(
         name=name,
         order=order,
-        timeout_seconds=course_config.timeout_seconds,
+        timeout_seconds=settings.get("timeout_seconds", course_config.timeout_seconds),
+        limits=_parse_limits(settings, course_config.limits),
+        adaptive_timeout=adaptive_timeout,
+        requirements=tuple(settings.get("requirements", course_config.requirements)),
+        test_workers=_parse_test_workers(
+            settings.get("test_workers", course_config.test_workers),
+            exercise_path / "exercise.toml",
+        ),
     )
 
     # Load problem description
@@ -150,7 +233,7 @@ def load_exercise(
     )
 
 
-def _is_exercise_dir(path: Path) -> bool:
+def is_exercise_dir(path: Path) -> bool:
     """Check if a directory is an exercise.
 
     An exercise directory is detected if it has:
@@ -199,7 +282,7 @@ def _discover_exercises_recursive(
         if entry.name == "node_modules":
             continue
 
-        if _is_exercise_dir(entry):
+        if is_exercise_dir(entry):
             # This is an exercise directory
             exercises.append(load_exercise(entry, exercises_root, course_config))
         else:
@@ -227,6 +310,15 @@ def discover_exercises(exercises_path: Path, course_config: CourseConfig) -> lis
     return exercises
 
 
+def test_runner_for(language: str, course_config: CourseConfig) -> str | None:
+    """The test runner for exercises of a language in this course.
+
+    The course's ``test_runner`` is a runner of the course language; exercises
+    detected as another language use that language's default runner.
+    """
+    return course_config.test_runner if language == course_config.language else None
+
+
 def detect_language(exercise: Exercise, course_config: CourseConfig) -> str:
     """Detect the language for an exercise."""
     if course_config.language in ("react", "pytorch"):
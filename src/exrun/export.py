@@ -0,0 +1,160 @@
+"""Columnar export of progress databases (requires the ``export`` extra).
+
+Rows are read from each database in batches and written straight to a
+Parquet or Arrow IPC file, so memory use stays flat however many attempts
+are exported. Course, exercise and time filters are applied while reading:
+courses by skipping whole databases, the others in the SQL query.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from exrun.progress import ProgressDB, course_name
+
+ATTEMPT_SCHEMA = pa.schema([
+    ("source", pa.string()),
+    ("course", pa.string()),
+    ("exercise", pa.string()),
+    ("order_num", pa.string()),
+    ("attempt_id", pa.int64()),
+    ("created_at", pa.timestamp("s", tz="UTC")),
+    ("passed", pa.bool_()),
+    ("tests_run", pa.int32()),
+    ("tests_passed", pa.int32()),
+    ("failures", pa.string()),  # JSON list of {test_name, message, location, kind}
+    ("duration_ms", pa.int64()),
+    ("timed_out", pa.bool_()),
+    ("language", pa.string()),
+    ("user_cpu_ms", pa.int64()),
+    ("sys_cpu_ms", pa.int64()),
+    ("max_rss_kb", pa.int64()),
+    ("voluntary_switches", pa.int64()),
+    ("involuntary_switches", pa.int64()),
+    ("output", pa.string()),
+])
+
+EXERCISE_SCHEMA = pa.schema([
+    ("source", pa.string()),
+    ("course", pa.string()),
+    ("id", pa.int64()),
+    ("name", pa.string()),
+    ("order_num", pa.string()),
+    ("status", pa.string()),
+    ("attempts", pa.int32()),
+    ("first_passed_at", pa.string()),
+    ("last_attempt_at", pa.string()),
+])
+
+FORMATS = ("parquet", "arrow")
+
+
+def to_db_timestamp(value: datetime) -> str:
+    """Format a datetime like SQLite's CURRENT_TIMESTAMP (UTC); naive means local time."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _to_batch(rows: list[dict[str, Any]], schema: pa.Schema) -> pa.RecordBatch:
+    arrays = []
+    for schema_field in schema:
+        values = [row.get(schema_field.name) for row in rows]
+        if pa.types.is_timestamp(schema_field.type):
+            parsed = pc.strptime(pa.array(values, pa.string()), "%Y-%m-%d %H:%M:%S", "s")
+            arrays.append(parsed.cast(schema_field.type))
+        elif pa.types.is_boolean(schema_field.type):
+            # SQLite stores booleans as integers
+            arrays.append(pa.array([None if v is None else bool(v) for v in values], pa.bool_()))
+        else:
+            arrays.append(pa.array(values, schema_field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _rows(
+    db_paths: list[Path],
+    table: str,
+    course: str | None,
+    exercise: str | None,
+    since: str | None,
+    until: str | None,
+    include_output: bool,
+    batch_size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    for db_path in db_paths:
+        name = course_name(db_path)
+        if course is not None and name != course:
+            continue
+        source = {"source": str(db_path), "course": name}
+        db = ProgressDB(db_path, read_only=True)
+        try:
+            if table == "attempts":
+                for rows in db.iter_attempts(exercise, since, until, include_output, batch_size):
+                    yield [source | row for row in rows]
+            else:
+                yield [source | row for row in db.iter_exercises(exercise)]
+        finally:
+            db.close()
+
+
+def _coalesce(
+    chunks: Iterator[list[dict[str, Any]]], batch_size: int
+) -> Iterator[list[dict[str, Any]]]:
+    """Regroup rows into batches of ``batch_size``; small databases share a batch."""
+    pending: list[dict[str, Any]] = []
+    for chunk in chunks:
+        pending.extend(chunk)
+        while len(pending) >= batch_size:
+            yield pending[:batch_size]
+            pending = pending[batch_size:]
+    if pending:
+        yield pending
+
+
+def export(
+    db_paths: list[Path],
+    output: Path,
+    table: str = "attempts",
+    output_format: str = "parquet",
+    course: str | None = None,
+    exercise: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    include_output: bool = False,
+    batch_size: int = 10000,
+) -> int:
+    """Write one table of many progress databases to a columnar file.
+
+    Returns the number of rows written.
+    """
+    schema = ATTEMPT_SCHEMA if table == "attempts" else EXERCISE_SCHEMA
+    chunks = _rows(
+        db_paths,
+        table,
+        course,
+        exercise,
+        to_db_timestamp(since) if since else None,
+        to_db_timestamp(until) if until else None,
+        include_output,
+        batch_size,
+    )
+    batches = (_to_batch(rows, schema) for rows in _coalesce(chunks, batch_size))
+
+    written = 0
+    if output_format == "parquet":
+        with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                written += batch.num_rows
+    else:
+        with pa.OSFile(str(output), "wb") as sink, ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                written += batch.num_rows
+    return written
@@ -0,0 +1,293 @@
+"""Bulk grading of many student copies of a course."""
+
+from __future__ import annotations
+
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+from rich.progress import Progress
+
+from exrun.adapters import TestAdapter, get_adapter
+from exrun.cpu import CpuBudget, available_cpus
+from exrun.exercise import detect_language, find_project_root, test_runner_for
+from exrun.models import (
+    CourseConfig,
+    Exercise,
+    FailureKind,
+    ResourceUsage,
+    TestFailure,
+    TestResult,
+)
+from exrun.progress import ProgressDB
+from exrun.timeouts import effective_timeout
+
+
+def result_to_dict(result: TestResult) -> dict[str, Any]:
+    """Serialize a TestResult to JSON-compatible data."""
+    data = asdict(result)
+    for failure in data["failures"]:
+        failure["kind"] = failure["kind"].value
+    return data
+
+
+def result_from_dict(data: dict[str, Any]) -> TestResult:
+    """Rebuild a TestResult serialized with result_to_dict."""
+    failures = [
+        TestFailure(
+            test_name=f["test_name"],
+            message=f["message"],
+            location=f.get("location"),
+            kind=FailureKind(f.get("kind", FailureKind.TEST.value)),
+        )
+        for f in data.get("failures", [])
+    ]
+    usage = ResourceUsage(**data["usage"]) if data.get("usage") else None
+    return TestResult(
+        passed=data["passed"],
+        tests_run=data["tests_run"],
+        tests_passed=data["tests_passed"],
+        failures=failures,
+        output=data.get("output", ""),
+        duration_ms=data.get("duration_ms", 0),
+        usage=usage,
+    )
+
+
+@dataclass
+class GradeJob:
+    """One exercise of one student's submission."""
+
+    student: str
+    exercise: Exercise
+    exercise_key: str
+    language: str
+
+
+@dataclass
+class GradeOutcome:
+    student: str
+    exercise_key: str
+    result: TestResult
+
+
+def discover_submissions(submissions_dir: Path) -> dict[str, Path]:
+    """Map student names to their course roots (one subdirectory each)."""
+    return {
+        entry.name: entry
+        for entry in sorted(submissions_dir.iterdir())
+        if entry.is_dir() and not entry.name.startswith((".", "_"))
+    }
+
+
+class Grader:
+    """Grades every student's copy of a course against a reference layout.
+
+    The course is discovered once from the reference copy. Each exercise is
+    then relocated into each student's tree, and the resulting jobs run on a
+    worker pool sharing one adapter instance per language.
+    """
+
+    def __init__(
+        self,
+        course_config: CourseConfig,
+        exercises: list[Exercise],
+        console: Console | None = None,
+        workers: int | None = None,
+    ):
+        self.course_config = course_config
+        self.exercises = exercises
+        self.console = console or Console()
+        self.workers = workers or available_cpus()
+        self.course_root = course_config.exercises_path.parent
+        self._languages = {
+            self.exercise_key(ex): detect_language(ex, course_config) for ex in exercises
+        }
+        self._adapters: dict[str, TestAdapter] = {}
+
+    def exercise_key(self, exercise: Exercise) -> str:
+        """Stable identifier of an exercise: its path relative to the course root."""
+        return exercise.path.relative_to(self.course_root).as_posix()
+
+    def language(self, exercise_key: str) -> str:
+        return self._languages[exercise_key]
+
+    def adapter(self, language: str) -> TestAdapter:
+        if language not in self._adapters:
+            self._adapters[language] = get_adapter(
+                language, test_runner_for(language, self.course_config)
+            )
+        return self._adapters[language]
+
+    def build_jobs(self, submissions: dict[str, Path]) -> list[GradeJob]:
+        """Create jobs in exercise-major order.
+
+        Interleaving students this way keeps the pool fair: every student's
+        first exercise is graded before anyone's second, so no submission
+        waits for a whole other submission to finish.
+        """
+        return [
+            self.job_for(student, root, self.exercise_key(exercise))
+            for exercise in self.exercises
+            for student, root in submissions.items()
+        ]
+
+    def job_for(self, student: str, student_root: Path, exercise_key: str) -> GradeJob:
+        """Relocate a reference exercise into a student's tree."""
+        exercise = next(ex for ex in self.exercises if self.exercise_key(ex) == exercise_key)
+        return GradeJob(
+            student=student,
+            exercise=replace(exercise, path=student_root / exercise_key),
+            exercise_key=exercise_key,
+            language=self._languages[exercise_key],
+        )
+
+    def run_job(self, job: GradeJob) -> GradeOutcome:
+        """Run one job. Safe to call from worker threads."""
+        if not job.exercise.path.exists():
+            result = TestResult(
+                passed=False,
+                tests_run=0,
+                tests_passed=0,
+                failures=[TestFailure(
+                    "missing", f"Exercise not found: {job.exercise_key}", kind=FailureKind.ERROR
+                )],
+                output="",
+            )
+            return GradeOutcome(job.student, job.exercise_key, result)
+
+        adapter = self.adapter(job.language)
+        timeout = effective_timeout(job.exercise, [], adapter.min_timeout_seconds)
+        result = adapter.run_tests(job.exercise, timeout.seconds)
+        return GradeOutcome(job.student, job.exercise_key, result)
+
+    def ensure_dependencies(self, jobs: list[GradeJob]) -> None:
+        """Install each student project's packages once, before its jobs run side by side.
+
+        A failed install is left for the jobs to report, as they retry it.
+        """
+        first_jobs: dict[tuple[str, Path], GradeJob] = {}
+        for job in jobs:
+            if job.exercise.path.exists():
+                key = (job.language, find_project_root(job.exercise))
+                first_jobs.setdefault(key, job)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for job in first_jobs.values():
+                pool.submit(self.adapter(job.language).ensure_dependencies, job.exercise)
+
+    def _run_budgeted(self, budget: CpuBudget, job: GradeJob) -> GradeOutcome:
+        with budget.allocate():
+            return self.run_job(job)
+
+    def grade(
+        self, submissions: dict[str, Path], record_progress: bool = True
+    ) -> list[GradeOutcome]:
+        """Grade all submissions, optionally recording attempts per student."""
+        jobs = self.build_jobs(submissions)
+        # Create adapters up front so worker threads only read the cache
+        for language in set(self._languages.values()):
+            self.adapter(language)
+        self.ensure_dependencies(jobs)
+
+        outcomes: list[GradeOutcome] = []
+        recorder = ProgressRecorder(self, submissions) if record_progress else None
+        try:
+            with (
+                ThreadPoolExecutor(max_workers=self.workers) as pool,
+                Progress(console=self.console, transient=True) as progress,
+            ):
+                task = progress.add_task("Grading", total=len(jobs))
+                budget = CpuBudget(self.workers, jobs=len(jobs))
+                futures = [pool.submit(self._run_budgeted, budget, job) for job in jobs]
+                for future in as_completed(futures):
+                    outcome = future.result()
+                    outcomes.append(outcome)
+                    progress.advance(task)
+                    if recorder:
+                        recorder.record(outcome)
+        finally:
+            if recorder:
+                recorder.close()
+
+        return self.sort_outcomes(outcomes)
+
+    def sort_outcomes(self, outcomes: list[GradeOutcome]) -> list[GradeOutcome]:
+        """Order outcomes by student, then course order."""
+        order = {self.exercise_key(ex): i for i, ex in enumerate(self.exercises)}
+        return sorted(outcomes, key=lambda o: (o.student, order[o.exercise_key]))
+
+
+class ProgressRecorder:
+    """Records grading outcomes in each student's progress.db.
+
+    Connections are opened lazily and must stay on the creating thread.
+    """
+
+    def __init__(self, grader: Grader, submissions: dict[str, Path]):
+        self.grader = grader
+        self.submissions = submissions
+        self._exercises = {grader.exercise_key(ex): ex for ex in grader.exercises}
+        self._databases: dict[str, ProgressDB] = {}
+
+    def record(self, outcome: GradeOutcome) -> None:
+        db = self._databases.get(outcome.student)
+        if db is None:
+            db_path = self.submissions[outcome.student] / "progress.db"
+            db = self._databases[outcome.student] = ProgressDB(db_path)
+        db.record_attempt(
+            self._exercises[outcome.exercise_key],
+            outcome.result,
+            self.grader.language(outcome.exercise_key),
+        )
+
+    def close(self) -> None:
+        for db in self._databases.values():
+            db.close()
+
+
+def write_json_report(
+    path: Path, course_config: CourseConfig, outcomes: list[GradeOutcome]
+) -> None:
+    """Write a consolidated JSON report grouped by student."""
+    students: dict[str, dict[str, Any]] = {}
+    for outcome in outcomes:
+        entry = students.setdefault(outcome.student, {"passed": 0, "total": 0, "exercises": {}})
+        result = result_to_dict(outcome.result)
+        result.pop("output")
+        entry["exercises"][outcome.exercise_key] = result
+        entry["total"] += 1
+        entry["passed"] += int(outcome.result.passed)
+
+    report = {
+        "course": course_config.name,
+        "version": course_config.version,
+        "generated_at": datetime.now().isoformat(),
+        "students": students,
+    }
+    path.write_text(json.dumps(report, indent=2))
+
+
+def write_csv_report(path: Path, outcomes: list[GradeOutcome]) -> None:
+    """Write one CSV row per student and exercise."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "student", "exercise", "passed", "tests_run", "tests_passed", "duration_ms",
+            "failures",
+        ])
+        for outcome in outcomes:
+            result = outcome.result
+            writer.writerow([
+                outcome.student,
+                outcome.exercise_key,
+                int(result.passed),
+                result.tests_run,
+                result.tests_passed,
+                result.duration_ms,
+                "; ".join(f.test_name for f in result.failures),
+            ])
@@ -0,0 +1,115 @@
+"""Latency histograms for watch mode.
+
+Histograms use HDR-style log-linear buckets over whole milliseconds: values
+below 128 ms get a bucket each, and every power of two above that is split
+into 64 buckets, so any recorded value is within 1% of its bucket's
+midpoint. A histogram is just a mapping of bucket index to count, which
+makes merging and persisting them trivial.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from rich.table import Table
+
+_LINEAR_LIMIT = 128
+_SUB_BUCKETS = 64
+
+# Stages of a watch-mode run, in the order they happen. Each is the time
+# between two of the timestamps in WatchTiming; "save_to_result" is the total.
+WATCH_METRICS = (
+    "save_to_trigger",
+    "queue_wait",
+    "run",
+    "render",
+    "save_to_result",
+)
+
+
+def bucket_index(value_ms: int) -> int:
+    if value_ms < _LINEAR_LIMIT:
+        return max(value_ms, 0)
+    shift = value_ms.bit_length() - 7
+    top = value_ms >> shift
+    return _LINEAR_LIMIT + (shift - 1) * _SUB_BUCKETS + (top - _SUB_BUCKETS)
+
+
+def bucket_value(index: int) -> float:
+    """Midpoint of a bucket, in milliseconds."""
+    if index < _LINEAR_LIMIT:
+        return float(index)
+    shift, offset = divmod(index - _LINEAR_LIMIT, _SUB_BUCKETS)
+    shift += 1
+    low = (_SUB_BUCKETS + offset) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+@dataclass
+class LatencyHistogram:
+    counts: dict[int, int] = field(default_factory=dict)
+
+    def record(self, value_ms: float) -> None:
+        index = bucket_index(round(value_ms))
+        self.counts[index] = self.counts.get(index, 0) + 1
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def percentile(self, pct: float) -> float:
+        """Value at a percentile (0-100), to bucket precision."""
+        total = self.total
+        if total == 0:
+            return 0.0
+        rank = max(1, round(pct / 100 * total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return bucket_value(index)
+        return bucket_value(max(self.counts))
+
+
+@dataclass
+class WatchTiming:
+    """Wall-clock timestamps (time.time()) of one watch-mode run."""
+
+    saved_at: float  # Latest mtime of the changed files
+    triggered_at: float  # Watcher debounce ended or editor reported the save
+    run_started_at: float
+    run_finished_at: float
+    rendered_at: float
+
+    def durations_ms(self) -> dict[str, float]:
+        return {
+            "save_to_trigger": (self.triggered_at - self.saved_at) * 1000,
+            "queue_wait": (self.run_started_at - self.triggered_at) * 1000,
+            "run": (self.run_finished_at - self.run_started_at) * 1000,
+            "render": (self.rendered_at - self.run_finished_at) * 1000,
+            "save_to_result": (self.rendered_at - self.saved_at) * 1000,
+        }
+
+
+def latency_table(title: str, histograms: dict[str, LatencyHistogram]) -> Table:
+    """Percentile summary of watch-mode histograms."""
+    table = Table(title=title)
+    table.add_column("Stage")
+    table.add_column("Runs", justify="right")
+    for pct in ("p50", "p95", "p99"):
+        table.add_column(pct, justify="right")
+
+    for metric in WATCH_METRICS:
+        histogram = histograms.get(metric)
+        if histogram is None or histogram.total == 0:
+            continue
+        table.add_row(
+            metric,
+            str(histogram.total),
+            *(f"{histogram.percentile(pct):.0f} ms" for pct in (50, 95, 99)),
+        )
+    return table
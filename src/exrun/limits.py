@@ -0,0 +1,205 @@
+"""Resource limits for test processes (rlimits and cgroup v2)."""
+
+from __future__ import annotations
+
+import os
+import signal
+import uuid
+from pathlib import Path
+
+from exrun.models import ResourceLimits, ResourceUsage
+
+CGROUP_MOUNT = Path("/sys/fs/cgroup")
+
+# Output fragments left behind by runtimes that hit an rlimit
+_MEMORY_MARKERS = ("MemoryError", "Cannot allocate memory", "JavaScript heap out of memory")
+_PROCESS_MARKERS = ("Resource temporarily unavailable", "BlockingIOError", "EAGAIN")
+_FILE_SIZE_MARKERS = ("File too large", "EFBIG")
+
+
+def _own_cgroup() -> Path | None:
+    """Return the cgroup v2 directory of the current process, if any."""
+    try:
+        lines = Path("/proc/self/cgroup").read_text().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        if line.startswith("0::"):
+            return CGROUP_MOUNT / line[3:].lstrip("/")
+    return None
+
+
+def _cgroup_root() -> Path | None:
+    """Find a writable cgroup v2 directory that exrun may create children in.
+
+    ``EXRUN_CGROUP_ROOT`` points at a delegated cgroup set up by an
+    administrator. Otherwise the process's own cgroup is used, which only
+    works where it may have children (e.g. the root cgroup of a container).
+    """
+    configured = os.environ.get("EXRUN_CGROUP_ROOT")
+    root = Path(configured) if configured else _own_cgroup()
+    if root is None or not (root / "cgroup.subtree_control").exists():
+        return None
+    if not os.access(root, os.W_OK):
+        return None
+    return root
+
+
+class CgroupScope:
+    """A transient cgroup v2 holding one test run's process tree."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def create(cls, limits: ResourceLimits) -> CgroupScope | None:
+        """Create a child cgroup enforcing memory/process limits, if possible."""
+        wanted: dict[str, str] = {}
+        if limits.memory_limit_mb:
+            wanted["memory.max"] = str(limits.memory_limit_mb * 1024 * 1024)
+        if limits.max_processes:
+            wanted["pids.max"] = str(limits.max_processes)
+        if not wanted:
+            return None
+
+        root = _cgroup_root()
+        if root is None:
+            return None
+        enabled = set((root / "cgroup.subtree_control").read_text().split())
+        if not {key.split(".")[0] for key in wanted} <= enabled:
+            return None
+
+        path = root / f"exrun-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        try:
+            path.mkdir()
+            for key, value in wanted.items():
+                (path / key).write_text(value)
+            # Kill the whole group on OOM instead of picking a single victim
+            if (path / "memory.oom.group").exists():
+                (path / "memory.oom.group").write_text("1")
+        except OSError:
+            cls(path).remove()
+            return None
+        return cls(path)
+
+    @property
+    def procs_file(self) -> str:
+        return str(self.path / "cgroup.procs")
+
+    def _event_count(self, filename: str, event: str) -> int:
+        try:
+            for line in (self.path / filename).read_text().splitlines():
+                name, _, value = line.partition(" ")
+                if name == event:
+                    return int(value)
+        except (OSError, ValueError):
+            pass
+        return 0
+
+    def memory_exceeded(self) -> bool:
+        return self._event_count("memory.events", "oom_kill") > 0
+
+    def processes_exceeded(self) -> bool:
+        return self._event_count("pids.events", "max") > 0
+
+    def remove(self) -> None:
+        """Remove the cgroup once all of its processes have exited."""
+        try:
+            self.path.rmdir()
+        except OSError:
+            pass
+
+
+def apply_limits(
+    pid: int,
+    limits: ResourceLimits,
+    cgroup: CgroupScope | None,
+    limit_address_space: bool = True,
+) -> None:
+    """Apply limits to a just-started process, whose descendants inherit them.
+
+    This runs in the parent after the spawn rather than as a ``preexec_fn``,
+    which is not safe in a process with threads. The child has only just
+    exec'd by then, before it can start a process tree.
+
+    Memory and process limits go through the cgroup when one is available,
+    since rlimits only bound address space (which V8 and Chromium reserve in
+    bulk) and count processes per user rather than per tree. rlimits need
+    ``prlimit``, which only Linux has.
+    """
+    if cgroup is not None:
+        with open(cgroup.procs_file, "w") as f:
+            f.write(str(pid))
+
+    import resource
+
+    if not hasattr(resource, "prlimit"):
+        return
+
+    rlimits: list[tuple[int, int]] = []
+    if limits.cpu_limit_seconds:
+        rlimits.append((resource.RLIMIT_CPU, limits.cpu_limit_seconds))
+    if limits.max_file_size_mb:
+        rlimits.append((resource.RLIMIT_FSIZE, limits.max_file_size_mb * 1024 * 1024))
+    if cgroup is None:
+        if limits.memory_limit_mb and limit_address_space:
+            rlimits.append((resource.RLIMIT_AS, limits.memory_limit_mb * 1024 * 1024))
+        if limits.max_processes:
+            rlimits.append((resource.RLIMIT_NPROC, limits.max_processes))
+
+    for which, value in rlimits:
+        _, hard = resource.prlimit(pid, which)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.prlimit(pid, which, (value, hard))
+
+
+def _killed_by(returncode: int, sig: int) -> bool:
+    """Whether a process (or the shell wrapping it) died from ``sig``."""
+    return returncode in (-sig, 128 + sig)
+
+
+def detect_limit_exceeded(
+    limits: ResourceLimits,
+    returncode: int,
+    output: str,
+    usage: ResourceUsage,
+    cgroup: CgroupScope | None,
+) -> str | None:
+    """Work out which limit, if any, terminated a failed run."""
+    if returncode == 0:
+        return None
+
+    if cgroup is not None:
+        if limits.memory_limit_mb and cgroup.memory_exceeded():
+            return "memory"
+        if limits.max_processes and cgroup.processes_exceeded():
+            return "processes"
+
+    if limits.cpu_limit_seconds:
+        cpu_seconds = (usage.user_cpu_ms + usage.sys_cpu_ms) / 1000
+        if _killed_by(returncode, signal.SIGXCPU) or (
+            _killed_by(returncode, signal.SIGKILL) and cpu_seconds >= limits.cpu_limit_seconds
+        ):
+            return "cpu"
+    if limits.max_file_size_mb and (
+        _killed_by(returncode, signal.SIGXFSZ) or any(m in output for m in _FILE_SIZE_MARKERS)
+    ):
+        return "file_size"
+    if limits.memory_limit_mb and any(m in output for m in _MEMORY_MARKERS):
+        return "memory"
+    if limits.max_processes and any(m in output for m in _PROCESS_MARKERS):
+        return "processes"
+    return None
+
+
+def describe_limit(limits: ResourceLimits, limit: str) -> str:
+    """Human-readable message for an exceeded limit."""
+    messages = {
+        "memory": f"Memory limit of {limits.memory_limit_mb} MB exceeded",
+        "cpu": f"CPU time limit of {limits.cpu_limit_seconds}s exceeded",
+        "processes": f"Process limit of {limits.max_processes} exceeded",
+        "file_size": f"File size limit of {limits.max_file_size_mb} MB exceeded",
+        "output": f"Output limit of {limits.max_output_bytes} bytes exceeded",
+    }
+    return messages.get(limit, f"Resource limit exceeded: {limit}")
@@ -0,0 +1,190 @@
+"""OpenMetrics textfile exporter.
+
+Renders what progress databases (and optionally a grading broker) have
+recorded as an OpenMetrics text file, for node_exporter's textfile collector
+or any other scraper that reads files instead of a network listener.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from exrun.latency import WATCH_METRICS, LatencyHistogram, bucket_value
+from exrun.progress import ProgressDB
+
+# Histogram bucket upper bounds, in seconds
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type: str  # "counter", "gauge" or "histogram"
+    help: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels: str) -> None:
+        self.samples.append((suffix, labels, value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def render(families: list[MetricFamily]) -> str:
+    """Render metric families in the OpenMetrics text format."""
+    lines = []
+    for family in families:
+        lines.append(f"# TYPE {family.name} {family.type}")
+        lines.append(f"# HELP {family.name} {family.help}")
+        for suffix, labels, value in family.samples:
+            lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class _LanguageTotals:
+    count: int = 0
+    timeouts: int = 0
+    duration_ms: int = 0
+    buckets: list[int] = field(default_factory=list)
+
+
+def _add_histogram(
+    family: MetricFamily,
+    bounds: tuple[float, ...],
+    cumulative: list[int],
+    count: int,
+    total: float,
+    **labels: str,
+) -> None:
+    for bound, bucket_count in zip(bounds, cumulative):
+        family.add(bucket_count, "_bucket", **labels, le=str(bound))
+    family.add(count, "_bucket", **labels, le="+Inf")
+    family.add(count, "_count", **labels)
+    family.add(total, "_sum", **labels)
+
+
+def _latency_cumulative(histogram: LatencyHistogram, bounds: tuple[float, ...]) -> list[int]:
+    """Cumulative counts of an HDR histogram at Prometheus bucket bounds."""
+    return [
+        sum(
+            count
+            for index, count in histogram.counts.items()
+            if bucket_value(index) <= bound * 1000
+        )
+        for bound in bounds
+    ]
+
+
+def collect(db_paths: list[Path], broker_dir: Path | None = None) -> list[MetricFamily]:
+    """Aggregate metrics over progress databases and an optional broker queue.
+
+    The databases are opened read-only, so they are not migrated; those of
+    a newer exrun are skipped.
+    """
+    attempts = MetricFamily(
+        "exrun_attempts", "counter", "Test runs by adapter language and result."
+    )
+    timeouts = MetricFamily("exrun_timeouts", "counter", "Test runs that hit their timeout.")
+    durations = MetricFamily(
+        "exrun_attempt_duration_seconds", "histogram", "Wall-clock duration of test runs."
+    )
+    watch = MetricFamily(
+        "exrun_watch_latency_seconds", "histogram", "Watch-mode latency by stage."
+    )
+    sources = MetricFamily("exrun_progress_databases", "gauge", "Progress databases read.")
+
+    bounds_ms = [int(bound * 1000) for bound in DURATION_BUCKETS]
+    by_language: dict[str, _LanguageTotals] = {}
+    run_counts: dict[tuple[str, str], int] = {}
+    latency: dict[str, LatencyHistogram] = {}
+
+    read = 0
+    for db_path in db_paths:
+        try:
+            db = ProgressDB(db_path, read_only=True)
+        except RuntimeError:
+            continue
+        read += 1
+        try:
+            for row in db.get_attempt_stats(bounds_ms):
+                language = row["language"]
+                key = (language, "pass" if row["passed"] else "fail")
+                run_counts[key] = run_counts.get(key, 0) + row["count"]
+                totals = by_language.setdefault(
+                    language, _LanguageTotals(buckets=[0] * len(bounds_ms))
+                )
+                totals.count += row["count"]
+                totals.timeouts += row["timeouts"]
+                totals.duration_ms += row["duration_ms"]
+                totals.buckets = [a + b for a, b in zip(totals.buckets, row["buckets"])]
+            for metric, recorded in db.get_latencies().items():
+                latency.setdefault(metric, LatencyHistogram()).merge(recorded)
+        finally:
+            db.close()
+
+    for (language, result), count in sorted(run_counts.items()):
+        attempts.add(count, "_total", language=language, result=result)
+    for language, totals in sorted(by_language.items()):
+        timeouts.add(totals.timeouts, "_total", language=language)
+        _add_histogram(
+            durations,
+            DURATION_BUCKETS,
+            totals.buckets,
+            totals.count,
+            totals.duration_ms / 1000,
+            language=language,
+        )
+    for metric in WATCH_METRICS:
+        histogram = latency.get(metric)
+        if histogram is None:
+            continue
+        total = sum(bucket_value(index) * count for index, count in histogram.counts.items())
+        _add_histogram(
+            watch,
+            LATENCY_BUCKETS,
+            _latency_cumulative(histogram, LATENCY_BUCKETS),
+            histogram.total,
+            total / 1000,
+            stage=metric,
+        )
+    sources.add(read)
+
+    families = [attempts, timeouts, durations, watch, sources]
+    if broker_dir is not None:
+        from exrun.broker import JobBroker
+
+        queue = MetricFamily("exrun_broker_jobs", "gauge", "Grading broker jobs by status.")
+        broker = JobBroker(broker_dir)
+        try:
+            counts = broker.counts()
+        finally:
+            broker.close()
+        for status in ("pending", "leased", "done"):
+            queue.add(counts.get(status, 0), status=status)
+        families.append(queue)
+    return families
+
+
+def write_textfile(path: Path, text: str) -> None:
+    """Replace ``path`` atomically, so collectors never read a partial file."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
@@ -1,6 +1,6 @@
 """Data models for exercise runner."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 
@@ -20,11 +20,41 @@ class Language(Enum):
     REACT = "react"
 
 
+class FailureKind(Enum):
+    TEST = "test"
+    TIMEOUT = "timeout"
+    RESOURCE_LIMIT = "resource_limit"
+    ERROR = "error"
+    SYNTAX = "syntax"
+
+
 @dataclass
 class TestFailure:
     test_name: str
     message: str
     location: str | None = None
+    kind: FailureKind = FailureKind.TEST
+
+
+@dataclass
+class ResourceUsage:
+    """CPU, memory and scheduling accounting for a test process tree."""
+
+    user_cpu_ms: int = 0
+    sys_cpu_ms: int = 0
+    max_rss_kb: int = 0
+    voluntary_switches: int = 0
+    involuntary_switches: int = 0
+
+    def __add__(self, other: "ResourceUsage") -> "ResourceUsage":
+        """Combine usage of sequential runs (peak RSS is the max, not the sum)."""
+        return ResourceUsage(
+            user_cpu_ms=self.user_cpu_ms + other.user_cpu_ms,
+            sys_cpu_ms=self.sys_cpu_ms + other.sys_cpu_ms,
+            max_rss_kb=max(self.max_rss_kb, other.max_rss_kb),
+            voluntary_switches=self.voluntary_switches + other.voluntary_switches,
+            involuntary_switches=self.involuntary_switches + other.involuntary_switches,
+        )
 
 
 @dataclass
@@ -35,6 +65,38 @@ class TestResult:
     failures: list[TestFailure]
     output: str
     duration_ms: int = 0
+    usage: ResourceUsage | None = None
+
+    @property
+    def timed_out(self) -> bool:
+        return any(f.kind == FailureKind.TIMEOUT for f in self.failures)
+
+    @property
+    def syntax_error(self) -> bool:
+        """Whether the syntax pre-check failed, so no tests ran."""
+        return any(f.kind == FailureKind.SYNTAX for f in self.failures)
+
+
+@dataclass
+class ResourceLimits:
+    """Resource limits applied to test processes. ``None`` means unlimited."""
+
+    memory_limit_mb: int | None = None
+    cpu_limit_seconds: int | None = None
+    max_processes: int | None = None
+    max_file_size_mb: int | None = None
+    max_output_bytes: int | None = None
+
+
+@dataclass
+class AdaptiveTimeout:
+    """Policy for deriving timeouts from historical run durations."""
+
+    enabled: bool = True
+    multiplier: float = 3.0
+    floor_seconds: int = 5
+    ceiling_seconds: int = 600
+    min_samples: int = 5
 
 
 @dataclass
@@ -42,6 +104,12 @@ class ExerciseConfig:
     name: str
     order: tuple[int, ...]  # Hierarchical ordering, e.g., (1, 2) for exercises/01_*/02_*
     timeout_seconds: int = 30
+    limits: ResourceLimits = field(default_factory=ResourceLimits)
+    adaptive_timeout: AdaptiveTimeout = field(default_factory=AdaptiveTimeout)
+    # Python packages to test with, installed in a cached environment
+    requirements: tuple[str, ...] = ()
+    # Parallel workers inside one test run: a count, "auto", or None for the tool default
+    test_workers: int | str | None = None
 
 
 @dataclass
@@ -80,5 +148,9 @@ class CourseConfig:
     exercises_path: Path
     version: str = "1.0.0"
     language: str = "python"
-    test_runner: str = "pytest"
+    test_runner: str | None = None
     timeout_seconds: int = 30
+    limits: ResourceLimits = field(default_factory=ResourceLimits)
+    adaptive_timeout: AdaptiveTimeout = field(default_factory=AdaptiveTimeout)
+    requirements: tuple[str, ...] = ()
+    test_workers: int | str | None = None
@@ -0,0 +1,140 @@
+"""Temporary course trees that swap in a different src/ for one exercise.
+
+An overlay mirrors the course root without copying file contents: files are
+reflinked where the filesystem supports it and hardlinked otherwise (falling
+back to a copy across devices), and ``node_modules`` is symlinked. Directories
+are always created fresh, so anything a test run writes (caches, reports,
+``__pycache__``) lands in the overlay rather than the working tree.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import sys
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+
+from exrun.cache import remove_project_caches
+from exrun.models import Exercise
+
+# ioctl request number for FICLONE on Linux
+_FICLONE = 0x40049409
+
+# Entries at the course root that are never mirrored
+_SKIPPED_ROOT_ENTRIES = {"progress.db", "progress.db-journal", "test-results"}
+
+
+def _is_cache(entry: Path) -> bool:
+    """Hidden entries and bytecode caches, which tools rewrite in place."""
+    return entry.name.startswith(".") or entry.name == "__pycache__"
+
+
+class _Linker:
+    """Links files using the cheapest method that works, remembering failures."""
+
+    def __init__(self) -> None:
+        self._reflink = sys.platform == "linux"
+        self._hardlink = True
+
+    def link(self, src: Path, dst: Path) -> None:
+        if self._reflink and self._try_reflink(src, dst):
+            return
+        if self._hardlink:
+            try:
+                os.link(src, dst)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+                self._hardlink = False
+        shutil.copy2(src, dst)
+
+    def _try_reflink(self, src: Path, dst: Path) -> bool:
+        import fcntl
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError:
+                self._reflink = False
+                fdst.close()
+                dst.unlink()
+                return False
+        shutil.copystat(src, dst)
+        return True
+
+    def tree(self, src: Path, dst: Path) -> None:
+        """Mirror a directory tree, linking every file."""
+        dst.mkdir(parents=True, exist_ok=True)
+        for entry in src.iterdir():
+            target = dst / entry.name
+            if _is_cache(entry):
+                continue
+            if entry.name == "node_modules" or entry.is_symlink():
+                target.symlink_to(entry.resolve())
+            elif entry.is_dir():
+                self.tree(entry, target)
+            else:
+                self.link(entry, target)
+
+
+def _mirror_root(linker: _Linker, course_root: Path, overlay_root: Path, skip: Path) -> None:
+    """Mirror the course root except progress files and the exercises directory."""
+    for entry in course_root.iterdir():
+        if entry == skip or entry.name in _SKIPPED_ROOT_ENTRIES or _is_cache(entry):
+            continue
+        target = overlay_root / entry.name
+        if entry.name == "node_modules" or entry.is_symlink():
+            target.symlink_to(entry.resolve())
+        elif entry.is_dir():
+            linker.tree(entry, target)
+        else:
+            linker.link(entry, target)
+
+
+@contextmanager
+def exercise_overlay(
+    exercise: Exercise,
+    exercises_path: Path,
+    src_override: Path | None = None,
+) -> Iterator[Exercise]:
+    """Assemble a temporary course tree containing only ``exercise``.
+
+    With ``src_override`` the exercise's ``src/`` is replaced by that
+    directory. Yields the exercise relocated into the overlay; the tree is
+    removed on exit.
+
+    Hardlinked files share content with the working tree, so tests must not
+    modify files in place. Reflinks (btrfs, XFS) have no such restriction.
+    """
+    course_root = exercises_path.parent
+    relative = exercise.path.relative_to(course_root)
+
+    with tempfile.TemporaryDirectory(prefix="exrun-overlay-") as tmp:
+        overlay_root = Path(tmp) / course_root.name
+        overlay_root.mkdir()
+        linker = _Linker()
+        _mirror_root(linker, course_root, overlay_root, exercises_path)
+
+        overlay_exercise = overlay_root / relative
+        overlay_exercise.mkdir(parents=True)
+        for entry in exercise.path.iterdir():
+            if _is_cache(entry) or (src_override is not None and entry == exercise.src_path):
+                continue
+            target = overlay_exercise / entry.name
+            if entry.is_dir():
+                linker.tree(entry, target)
+            else:
+                linker.link(entry, target)
+        if src_override is not None:
+            linker.tree(src_override, overlay_exercise / "src")
+
+        try:
+            yield replace(exercise, path=overlay_exercise)
+        finally:
+            remove_project_caches(overlay_root)
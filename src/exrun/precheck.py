@@ -0,0 +1,292 @@
+"""Syntax pre-check of exercise sources before the test harness starts.
+
+A syntax error in a student's file makes the whole run fail anyway, but
+reporting it through pytest, Vitest or Playwright means booting them first.
+Python files are compiled in-process. JavaScript and TypeScript files go to
+a Node worker kept running per project, which parses with the project's own
+TypeScript, esbuild or Babel, or with V8 for plain JavaScript.
+Files that parsed cleanly are not parsed again until they change.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import select
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, cast
+
+from exrun.exercise import find_project_root
+from exrun.models import Exercise, FailureKind, TestFailure, TestResult
+
+_SCRIPT_SUFFIXES = {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts"}
+_SKIP_DIRS = {"node_modules", "__pycache__"}
+
+# Seconds to wait for the parser worker, including its startup on first use
+_WORKER_TIMEOUT = 10
+
+_PARSER_WORKER = r"""
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+const vm = require("vm");
+
+function load(name) {
+  try {
+    return require(require.resolve(name, { paths: [process.cwd()] }));
+  } catch {
+    return null;
+  }
+}
+
+const ts = load("typescript");
+const esbuild = ts ? null : load("esbuild");
+const babel = ts || esbuild ? null : load("@babel/parser");
+const TYPED = [".ts", ".tsx", ".mts", ".cts"];
+
+function check(file) {
+  const source = fs.readFileSync(file, "utf8");
+  const ext = path.extname(file);
+  if (ts) {
+    const kinds = { ".ts": ts.ScriptKind.TS, ".mts": ts.ScriptKind.TS, ".cts": ts.ScriptKind.TS,
+                    ".tsx": ts.ScriptKind.TSX, ".jsx": ts.ScriptKind.JSX };
+    const kind = kinds[ext] ?? ts.ScriptKind.JS;
+    const sf = ts.createSourceFile(file, source, ts.ScriptTarget.Latest, false, kind);
+    const diagnostic = sf.parseDiagnostics[0];
+    if (!diagnostic) return { ok: true };
+    const { line, character } = sf.getLineAndCharacterOfPosition(diagnostic.start);
+    const message = ts.flattenDiagnosticMessageText(diagnostic.messageText, " ");
+    return { error: message, line: line + 1, column: character + 1 };
+  }
+  if (esbuild) {
+    const loader = ext === ".tsx" ? "tsx" : TYPED.includes(ext) ? "ts" : "jsx";
+    try {
+      esbuild.transformSync(source, { loader, sourcefile: file });
+      return { ok: true };
+    } catch (e) {
+      const m = e.errors && e.errors[0];
+      if (!m) throw e;
+      return { error: m.text, line: m.location?.line, column: (m.location?.column ?? 0) + 1 };
+    }
+  }
+  if (babel) {
+    const plugins = ext === ".ts" || ext === ".mts" || ext === ".cts" ? ["typescript"]
+      : ext === ".tsx" ? ["typescript", "jsx"] : ["jsx"];
+    try {
+      babel.parse(source, { sourceType: "unambiguous", plugins });
+      return { ok: true };
+    } catch (e) {
+      if (!e.loc) throw e;
+      return { error: e.message.replace(/ \(\d+:\d+\)$/, ""), line: e.loc.line,
+               column: e.loc.column + 1 };
+    }
+  }
+  if (ext === ".jsx" || TYPED.includes(ext)) return { skipped: true };
+  // A .js file may be a classic script (sloppy mode, e.g. in HTML pages), a
+  // CommonJS module or an ES module: it is only an error if no parse accepts it
+  const script = ext === ".mjs" ? null : parseScript(source, file);
+  if (script === undefined) return { ok: true };
+  const module = ext === ".cjs" ? null : parseModule(source, file);
+  if (module === undefined) return { ok: true };
+  // The script parse stops at import/export in a module, so prefer the other
+  if (!script || /\b(import|export)\b/.test(script.error)) return module ?? script;
+  return script;
+}
+
+function parseScript(source, file) {
+  try {
+    // Wrapped as CommonJS does, so a top-level return is accepted
+    vm.compileFunction(source, ["exports", "require", "module", "__filename", "__dirname"],
+                       { filename: file });
+    return undefined;
+  } catch (e) {
+    if (e.name !== "SyntaxError") throw e;
+    const line = /^.*:(\d+)\n/.exec(e.stack);
+    return { error: e.message, line: line ? Number(line[1]) : undefined };
+  }
+}
+
+function parseModule(source, file) {
+  try {
+    new vm.SourceTextModule(source, { identifier: file });
+    return undefined;
+  } catch (e) {
+    if (e.name !== "SyntaxError") throw e;
+    return { error: e.message };
+  }
+}
+
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  let reply;
+  try {
+    reply = check(JSON.parse(line).path);
+  } catch (e) {
+    reply = { skipped: true, reason: String(e) };
+  }
+  process.stdout.write(JSON.stringify(reply) + "\n");
+});
+"""
+
+# Files that parsed cleanly, with the (mtime_ns, size) they had then
+_parsed: dict[Path, tuple[int, int]] = {}
+
+
+class _ParserWorker:
+    """A Node process parsing files on request, kept warm across runs."""
+
+    def __init__(self, node: str, project_root: Path):
+        self.proc = subprocess.Popen(
+            [node, "--no-warnings", "--experimental-vm-modules", "-e", _PARSER_WORKER],
+            cwd=project_root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self.lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def check(self, path: Path) -> dict[str, Any] | None:
+        """Parse a file. Returns None if the worker did not answer."""
+        assert self.proc.stdin and self.proc.stdout
+        with self.lock:
+            try:
+                self.proc.stdin.write(json.dumps({"path": str(path)}) + "\n")
+                self.proc.stdin.flush()
+                ready, _, _ = select.select([self.proc.stdout], [], [], _WORKER_TIMEOUT)
+                line = self.proc.stdout.readline() if ready else ""
+            except OSError:
+                line = ""
+        if not line:
+            self.close()
+            return None
+        return cast(dict[str, Any], json.loads(line))
+
+    def close(self) -> None:
+        if self.alive:
+            self.proc.kill()
+            self.proc.wait()
+
+
+_workers: dict[Path, _ParserWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def _worker_for(project_root: Path) -> _ParserWorker | None:
+    with _workers_lock:
+        worker = _workers.get(project_root)
+        if worker is None or not worker.alive:
+            node = shutil.which("node")
+            if node is None:
+                return None
+            worker = _workers[project_root] = _ParserWorker(node, project_root)
+        return worker
+
+
+@atexit.register
+def _close_workers() -> None:
+    for worker in _workers.values():
+        worker.close()
+
+
+def _source_files(exercise: Exercise) -> Iterator[Path]:
+    """Student files of an exercise: its src/, or the exercise minus its tests."""
+    root = exercise.src_path if exercise.src_path.is_dir() else exercise.path
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            name for name in dirnames
+            if not name.startswith(".")
+            and name not in _SKIP_DIRS
+            and Path(dirpath, name) != exercise.tests_path
+        ]
+        for name in sorted(filenames):
+            path = Path(dirpath, name)
+            if path.suffix == ".py" or path.suffix in _SCRIPT_SUFFIXES:
+                yield path
+
+
+def _location(path: str, line: int | None, column: int | None) -> str:
+    """``path:line:column``, leaving out what the parser did not report."""
+    if not line:
+        return path
+    return f"{path}:{line}:{column}" if column else f"{path}:{line}"
+
+
+def _check_python(path: Path, location: str) -> TestFailure | None:
+    try:
+        # Compiled rather than only parsed: errors such as 'return' outside a
+        # function or duplicate argument names are only found by the compiler
+        compile(path.read_bytes(), str(path), "exec", dont_inherit=True)
+    except SyntaxError as e:
+        line = f"\n    {e.text.strip()}" if e.text else ""
+        return TestFailure(
+            location,
+            f"{e.msg} (line {e.lineno}){line}",
+            location=_location(location, e.lineno, e.offset),
+            kind=FailureKind.SYNTAX,
+        )
+    except ValueError as e:  # e.g. null bytes
+        return TestFailure(location, str(e), location=location, kind=FailureKind.SYNTAX)
+    return None
+
+
+def _check_script(path: Path, location: str, project_root: Path) -> TestFailure | None:
+    worker = _worker_for(project_root)
+    reply = worker.check(path) if worker else None
+    if reply is None or "error" not in reply:
+        return None
+    line = reply.get("line")
+    return TestFailure(
+        location,
+        f"{reply['error']} (line {line})" if line else reply["error"],
+        location=_location(location, line, reply.get("column")),
+        kind=FailureKind.SYNTAX,
+    )
+
+
+def check_syntax(exercise: Exercise) -> TestResult | None:
+    """Parse the exercise's changed source files.
+
+    Returns a failed result listing the syntax errors found, or None when
+    the tests should run. Files no parser is available for count as clean.
+    """
+    start = time.perf_counter()
+    failures: list[TestFailure] = []
+    for path in _source_files(exercise):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        key = (stat.st_mtime_ns, stat.st_size)
+        if _parsed.get(path) == key:
+            continue
+        location = path.relative_to(exercise.path).as_posix()
+        if path.suffix == ".py":
+            failure = _check_python(path, location)
+        else:
+            # The worker loads the parsers of the exercise's Node project
+            failure = _check_script(path, location, find_project_root(exercise))
+        if failure is None:
+            _parsed[path] = key
+        else:
+            failures.append(failure)
+
+    if not failures:
+        return None
+    return TestResult(
+        passed=False,
+        tests_run=0,
+        tests_passed=0,
+        failures=failures,
+        output="\n".join(f"{f.location}: {f.message}" for f in failures),
+        duration_ms=int((time.perf_counter() - start) * 1000),
+    )
@@ -0,0 +1,188 @@
+"""Subprocess execution with resource accounting."""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from exrun.limits import CgroupScope, apply_limits, detect_limit_exceeded
+from exrun.models import ResourceLimits, ResourceUsage
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a finished command."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    duration_ms: int
+    usage: ResourceUsage = field(default_factory=ResourceUsage)
+    limit_exceeded: str | None = None
+
+    @property
+    def output(self) -> str:
+        return self.stdout + self.stderr
+
+
+def _usage_from_rusage(rusage: object) -> ResourceUsage:
+    """Convert a ``resource.struct_rusage`` into a ResourceUsage."""
+    max_rss = int(getattr(rusage, "ru_maxrss", 0))
+    # Linux reports ru_maxrss in kilobytes, macOS in bytes
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    return ResourceUsage(
+        user_cpu_ms=int(getattr(rusage, "ru_utime", 0.0) * 1000),
+        sys_cpu_ms=int(getattr(rusage, "ru_stime", 0.0) * 1000),
+        max_rss_kb=max_rss,
+        voluntary_switches=int(getattr(rusage, "ru_nvcsw", 0)),
+        involuntary_switches=int(getattr(rusage, "ru_nivcsw", 0)),
+    )
+
+
+class _OutputCollector:
+    """Collects stdout/stderr chunks, enforcing a combined byte budget."""
+
+    def __init__(self, pid: int, max_bytes: int | None):
+        self.pid = pid
+        self.max_bytes = max_bytes
+        self.total = 0
+        self.exceeded = False
+        self._lock = threading.Lock()
+
+    def read(self, stream: IO[bytes], chunks: list[bytes]) -> None:
+        """Drain a pipe into a list of chunks until EOF."""
+        for chunk in iter(lambda: stream.read(65536), b""):
+            with self._lock:
+                if self.exceeded:
+                    continue
+                self.total += len(chunk)
+                if self.max_bytes is not None and self.total > self.max_bytes:
+                    chunk = chunk[: len(chunk) - (self.total - self.max_bytes)]
+                    self.exceeded = True
+                    _kill_process_group(self.pid)
+            chunks.append(chunk)
+        stream.close()
+
+
+def _kill_process_group(pid: int) -> None:
+    """Kill every process left in the command's session."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_command(
+    cmd: str | list[str],
+    cwd: Path,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+    limits: ResourceLimits | None = None,
+    limit_address_space: bool = True,
+) -> CommandResult:
+    """Run a command and account for the resources its process tree used.
+
+    The command is started in its own session so that the whole tree can be
+    killed on timeout. Usage is collected with ``wait4``, which covers the
+    direct child plus every descendant it reaped. Like ``subprocess.run``,
+    ``subprocess.TimeoutExpired`` is raised when the timeout elapses.
+
+    When ``limits`` are given they are applied to the process tree, and the
+    limit that killed a failed run is reported in ``limit_exceeded``.
+    """
+    limits = limits or ResourceLimits()
+    cgroup = CgroupScope.create(limits)
+
+    start = time.monotonic()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            shell=isinstance(cmd, str),
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+    except BaseException:
+        if cgroup:
+            cgroup.remove()
+        raise
+    try:
+        apply_limits(proc.pid, limits, cgroup, limit_address_space)
+    except BaseException:
+        _kill_process_group(proc.pid)
+        proc.wait()
+        if cgroup:
+            cgroup.remove()
+        raise
+
+    collector = _OutputCollector(proc.pid, limits.max_output_bytes)
+    stdout_chunks: list[bytes] = []
+    stderr_chunks: list[bytes] = []
+    readers = [
+        threading.Thread(target=collector.read, args=(proc.stdout, stdout_chunks), daemon=True),
+        threading.Thread(target=collector.read, args=(proc.stderr, stderr_chunks), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    wait_result: list[tuple[int, int, object]] = []
+
+    def _wait() -> None:
+        if hasattr(os, "wait4"):
+            wait_result.append(os.wait4(proc.pid, 0))
+        else:
+            proc.wait()
+
+    waiter = threading.Thread(target=_wait, daemon=True)
+    waiter.start()
+    waiter.join(timeout)
+
+    timed_out = waiter.is_alive()
+    # Reap the session either way: on timeout to stop the run, on success so
+    # stray grandchildren cannot hold the output pipes open.
+    _kill_process_group(proc.pid)
+    waiter.join()
+    for reader in readers:
+        reader.join()
+
+    stdout = b"".join(stdout_chunks).decode(errors="replace")
+    stderr = b"".join(stderr_chunks).decode(errors="replace")
+
+    usage = ResourceUsage()
+    if wait_result:
+        _, status, rusage = wait_result[0]
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        usage = _usage_from_rusage(rusage)
+
+    returncode = proc.returncode if proc.returncode is not None else -1
+    if collector.exceeded:
+        limit_exceeded: str | None = "output"
+    else:
+        limit_exceeded = detect_limit_exceeded(
+            limits, returncode, stdout + stderr, usage, cgroup
+        )
+    if cgroup:
+        cgroup.remove()
+
+    if timed_out and limit_exceeded is None:
+        raise subprocess.TimeoutExpired(cmd, timeout or 0, output=stdout, stderr=stderr)
+
+    return CommandResult(
+        returncode=returncode,
+        stdout=stdout,
+        stderr=stderr,
+        duration_ms=int((time.monotonic() - start) * 1000),
+        usage=usage,
+        limit_exceeded=limit_exceeded,
+    )
@@ -1,44 +1,195 @@
 """Progress tracking using SQLite."""
 
+import json
 import sqlite3
+from collections.abc import Callable, Iterator
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
+from exrun.exercise import load_course_config
+from exrun.latency import LatencyHistogram
 from exrun.models import Exercise, ExerciseStatus, TestResult
 
+# Columns added to attempts before the schema was versioned; unversioned
+# databases may have any subset of them.
+_LEGACY_ATTEMPT_COLUMNS = {
+    "user_cpu_ms": "INTEGER",
+    "sys_cpu_ms": "INTEGER",
+    "max_rss_kb": "INTEGER",
+    "voluntary_switches": "INTEGER",
+    "involuntary_switches": "INTEGER",
+    "timed_out": "BOOLEAN",
+    "language": "TEXT",
+    "tests_run": "INTEGER",
+    "tests_passed": "INTEGER",
+    "failures": "TEXT",
+}
+
+
+def _migrate_baseline(conn: sqlite3.Connection) -> None:
+    """Create the tables, or bring an unversioned database up to the same schema."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS exercises (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            order_num TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            first_passed_at TIMESTAMP,
+            last_attempt_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS attempts (
+            id INTEGER PRIMARY KEY,
+            exercise_id INTEGER REFERENCES exercises(id),
+            passed BOOLEAN NOT NULL,
+            output TEXT,
+            duration_ms INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS latency_buckets (
+            metric TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (metric, bucket)
+        )
+    """)
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(attempts)")}
+    for name, column_type in _LEGACY_ATTEMPT_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE attempts ADD COLUMN {name} {column_type}")
+
+
+def _migrate_attempt_indexes(conn: sqlite3.Connection) -> None:
+    """Index attempts for per-exercise history and time-range queries."""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS attempts_exercise_id ON attempts(exercise_id, id)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS attempts_created_at ON attempts(created_at)")
+
+
+def _migrate_attempt_autoincrement(conn: sqlite3.Connection) -> None:
+    """Rebuild attempts with AUTOINCREMENT ids.
+
+    Plain INTEGER PRIMARY KEY ids are reused after the newest rows are
+    deleted (e.g. by a reset), which readers tracking the last id they saw,
+    such as the warehouse, cannot tell apart from new attempts.
+    """
+    columns = ", ".join(
+        f"{name} {column_type}" for name, column_type in _LEGACY_ATTEMPT_COLUMNS.items()
+    )
+    names = ", ".join(
+        ["id", "exercise_id", "passed", "output", "duration_ms", "created_at",
+         *_LEGACY_ATTEMPT_COLUMNS]
+    )
+    conn.execute(f"""
+        CREATE TABLE attempts_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exercise_id INTEGER REFERENCES exercises(id),
+            passed BOOLEAN NOT NULL,
+            output TEXT,
+            duration_ms INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            {columns}
+        )
+    """)
+    conn.execute(f"INSERT INTO attempts_new ({names}) SELECT {names} FROM attempts")
+    conn.execute("DROP TABLE attempts")
+    conn.execute("ALTER TABLE attempts_new RENAME TO attempts")
+    _migrate_attempt_indexes(conn)
+
+
+# Schema migrations in order; a database at user_version N has had the first
+# N applied. Append new migrations here, never edit or reorder existing ones.
+_MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [
+    _migrate_baseline,
+    _migrate_attempt_indexes,
+    _migrate_attempt_autoincrement,
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def course_name(db_path: Path) -> str:
+    """Name of the course a progress.db belongs to, from the exrun.toml beside it."""
+    config_path = db_path.parent / "exrun.toml"
+    if config_path.exists():
+        return load_course_config(config_path).name
+    return db_path.parent.name
+
+
+def find_progress_dbs(paths: list[Path]) -> list[Path]:
+    """Expand files and directories (searched recursively) into progress.db paths."""
+    found: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            found.extend(sorted(path.rglob("progress.db")))
+        elif path.exists():
+            found.append(path)
+    return found
+
 
 class ProgressDB:
     """SQLite-based progress tracking."""
 
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, read_only: bool = False):
+        """Open a database, migrating it to the current schema.
+
+        A ``read_only`` database is neither written nor migrated; the readers
+        (``iter_attempts``, ``get_attempt_stats`` and the like) return NULL
+        for columns an older schema lacks. A newer schema raises RuntimeError.
+        """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        if read_only:
+            self.conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(db_path)
         self.conn.row_factory = sqlite3.Row
-        self._init_schema()
+        self._columns: dict[str, set[str]] = {}
+        try:
+            self._check_version()
+        except RuntimeError:
+            self.conn.close()
+            raise
+        if not read_only:
+            self._init_schema()
+
+    def _check_version(self) -> None:
+        version = self._schema_version()
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{self.db_path} has schema version {version}, newer than this exrun "
+                f"supports ({SCHEMA_VERSION}); upgrade exrun"
+            )
 
     def _init_schema(self) -> None:
-        """Initialize database schema."""
-        self.conn.executescript("""
-            CREATE TABLE IF NOT EXISTS exercises (
-                id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL UNIQUE,
-                order_num TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                attempts INTEGER DEFAULT 0,
-                first_passed_at TIMESTAMP,
-                last_attempt_at TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS attempts (
-                id INTEGER PRIMARY KEY,
-                exercise_id INTEGER REFERENCES exercises(id),
-                passed BOOLEAN NOT NULL,
-                output TEXT,
-                duration_ms INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        self.conn.commit()
+        """Apply any schema migrations the database has not had yet."""
+        if self._schema_version() == SCHEMA_VERSION:
+            return
+        # Take the write lock before re-reading the version, so two processes
+        # opening an old database at once do not both migrate it
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for index in range(self._schema_version(), SCHEMA_VERSION):
+                _MIGRATIONS[index](self.conn)
+                self.conn.execute(f"PRAGMA user_version = {index + 1}")
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _schema_version(self) -> int:
+        return int(self.conn.execute("PRAGMA user_version").fetchone()[0])
+
+    def _column(self, table: str, name: str, prefix: str = "") -> str:
+        """``<prefix><name>``, or NULL for a column an unmigrated database lacks."""
+        if table not in self._columns:
+            rows = self.conn.execute(f"PRAGMA table_info({table})")
+            self._columns[table] = {row["name"] for row in rows}
+        return f"{prefix}{name}" if name in self._columns[table] else "NULL"
 
     def ensure_exercise(self, exercise: Exercise) -> int:
         """Ensure exercise exists in DB, return its ID."""
@@ -47,7 +198,7 @@ class ProgressDB:
         )
         row = cursor.fetchone()
         if row:
-            return row["id"]
+            return int(row["id"])
 
         # Store order as string representation (e.g., "1.2.3")
         order_str = ".".join(str(o) for o in exercise.order)
@@ -76,8 +227,10 @@ class ProgressDB:
         row = cursor.fetchone()
         return row["attempts"] if row else 0
 
-    def record_attempt(self, exercise: Exercise, result: TestResult) -> None:
-        """Record an attempt for an exercise."""
+    def record_attempt(
+        self, exercise: Exercise, result: TestResult, language: str | None = None
+    ) -> None:
+        """Record an attempt for an exercise, run by the adapter for ``language``."""
         exercise_id = self.ensure_exercise(exercise)
         now = datetime.now().isoformat()
 
@@ -100,15 +253,83 @@ class ProgressDB:
                 (now, exercise_id),
             )
 
+        usage = result.usage
         self.conn.execute(
             """
-            INSERT INTO attempts (exercise_id, passed, output, duration_ms)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO attempts (
+                exercise_id, passed, output, duration_ms,
+                user_cpu_ms, sys_cpu_ms, max_rss_kb, voluntary_switches, involuntary_switches,
+                timed_out, language, tests_run, tests_passed, failures
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (exercise_id, result.passed, result.output, result.duration_ms),
+            (
+                exercise_id,
+                result.passed,
+                result.output,
+                # Not a test run, so it must not pull down timeouts or estimates
+                None if result.syntax_error else result.duration_ms,
+                usage.user_cpu_ms if usage else None,
+                usage.sys_cpu_ms if usage else None,
+                usage.max_rss_kb if usage else None,
+                usage.voluntary_switches if usage else None,
+                usage.involuntary_switches if usage else None,
+                result.timed_out,
+                language,
+                result.tests_run,
+                result.tests_passed,
+                json.dumps([
+                    {
+                        "test_name": f.test_name,
+                        "message": f.message,
+                        "location": f.location,
+                        "kind": f.kind.value,
+                    }
+                    for f in result.failures
+                ]),
+            ),
         )
         self.conn.commit()
 
+    def get_recent_durations(
+        self, exercise: Exercise, limit: int = 50, passed_only: bool = False
+    ) -> list[int]:
+        """Get wall-clock durations (ms) of the most recent completed runs.
+
+        Runs that timed out are excluded, since their duration is the timeout
+        itself rather than how long the tests take. With ``passed_only``,
+        failing runs (which may stop early, e.g. on an unimplemented stub) are
+        excluded too.
+        """
+        cursor = self.conn.execute(
+            """
+            SELECT a.duration_ms FROM attempts a
+            JOIN exercises e ON e.id = a.exercise_id
+            WHERE e.name = ? AND a.duration_ms IS NOT NULL AND NOT COALESCE(a.timed_out, 0)
+                AND (a.passed OR NOT ?)
+            ORDER BY a.id DESC
+            LIMIT ?
+            """,
+            (exercise.name, passed_only, limit),
+        )
+        return [row["duration_ms"] for row in cursor]
+
+    def get_last_timeout_ms(self, exercise: Exercise) -> int | None:
+        """Duration (the timeout) of the latest run if it timed out, else None."""
+        row = self.conn.execute(
+            """
+            SELECT a.duration_ms, a.timed_out FROM attempts a
+            JOIN exercises e ON e.id = a.exercise_id
+            WHERE e.name = ? AND a.duration_ms IS NOT NULL
+            ORDER BY a.id DESC
+            LIMIT 1
+            """,
+            (exercise.name,),
+        ).fetchone()
+        if row is None or not row["timed_out"]:
+            return None
+        return int(row["duration_ms"])
+
     def mark_skipped(self, exercise: Exercise) -> None:
         """Mark an exercise as skipped."""
         exercise_id = self.ensure_exercise(exercise)
@@ -152,6 +373,134 @@ class ProgressDB:
         cursor = self.conn.execute("SELECT name, status FROM exercises")
         return {row["name"]: ExerciseStatus(row["status"]) for row in cursor}
 
+    def iter_attempts(
+        self,
+        exercise: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        include_output: bool = False,
+        batch_size: int = 10000,
+        after_id: int = 0,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Stream attempts joined with their exercise, in batches.
+
+        ``since`` and ``until`` bound ``created_at`` (UTC, ``YYYY-MM-DD
+        HH:MM:SS``, as SQLite's CURRENT_TIMESTAMP writes it); ``after_id``
+        skips attempts already read by an earlier call.
+        """
+        conditions = ["a.id > ?"]
+        params: list[Any] = [after_id]
+        if exercise is not None:
+            conditions.append("e.name = ?")
+            params.append(exercise)
+        if since is not None:
+            conditions.append("a.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("a.created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}"
+        output_column = "a.output" if include_output else "NULL AS output"
+        legacy_columns = "".join(
+            f", {self._column('attempts', name, 'a.')} AS {name}"
+            for name in ("tests_run", "tests_passed", "failures", "timed_out", "language",
+                         "user_cpu_ms", "sys_cpu_ms", "max_rss_kb", "voluntary_switches",
+                         "involuntary_switches")
+        )
+
+        cursor = self.conn.execute(
+            f"""
+            SELECT
+                a.id AS attempt_id, e.name AS exercise, e.order_num, a.created_at,
+                a.passed, a.duration_ms{legacy_columns}, {output_column}
+            FROM attempts a
+            JOIN exercises e ON e.id = a.exercise_id
+            {where}
+            ORDER BY a.id
+            """,
+            params,
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield [dict(row) for row in rows]
+
+    def count_attempts(self, up_to_id: int) -> int:
+        """Number of attempts with ids up to ``up_to_id``."""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM attempts WHERE id <= ?", (up_to_id,)
+        ).fetchone()
+        return int(row["n"])
+
+    def iter_exercises(self, exercise: str | None = None) -> Iterator[dict[str, Any]]:
+        """Stream exercise rows, optionally only one exercise."""
+        query = "SELECT * FROM exercises"
+        params: tuple[str, ...] = ()
+        if exercise is not None:
+            query += " WHERE name = ?"
+            params = (exercise,)
+        for row in self.conn.execute(query + " ORDER BY id", params):
+            yield dict(row)
+
+    def get_attempt_stats(self, bounds_ms: list[int]) -> list[dict[str, Any]]:
+        """Aggregate attempts per language and outcome.
+
+        Each row has ``language``, ``passed``, ``count``, ``timeouts``,
+        ``duration_ms`` (the sum) and ``buckets``: cumulative counts of
+        attempts at most each of ``bounds_ms`` long.
+        """
+        bucket_columns = "".join(
+            f", SUM(COALESCE(duration_ms, 0) <= {int(bound)}) AS le_{i}"
+            for i, bound in enumerate(bounds_ms)
+        )
+        language = self._column("attempts", "language")
+        timed_out = self._column("attempts", "timed_out")
+        cursor = self.conn.execute(f"""
+            SELECT
+                COALESCE({language}, 'unknown') AS language,
+                passed,
+                COUNT(*) AS count,
+                SUM(COALESCE({timed_out}, 0)) AS timeouts,
+                SUM(COALESCE(duration_ms, 0)) AS duration_ms
+                {bucket_columns}
+            FROM attempts
+            GROUP BY 1, 2
+        """)
+        return [
+            {
+                "language": row["language"],
+                "passed": bool(row["passed"]),
+                "count": row["count"],
+                "timeouts": row["timeouts"],
+                "duration_ms": row["duration_ms"],
+                "buckets": [row[f"le_{i}"] for i in range(len(bounds_ms))],
+            }
+            for row in cursor
+        ]
+
+    def record_latencies(self, histograms: dict[str, LatencyHistogram]) -> None:
+        """Add histogram counts to the persisted ones."""
+        self.conn.executemany(
+            """
+            INSERT INTO latency_buckets (metric, bucket, count) VALUES (?, ?, ?)
+            ON CONFLICT (metric, bucket) DO UPDATE SET count = count + excluded.count
+            """,
+            [
+                (metric, bucket, count)
+                for metric, histogram in histograms.items()
+                for bucket, count in histogram.counts.items()
+            ],
+        )
+        self.conn.commit()
+
+    def get_latencies(self) -> dict[str, LatencyHistogram]:
+        """Get all persisted latency histograms by metric."""
+        histograms: dict[str, LatencyHistogram] = {}
+        if self._column("latency_buckets", "metric") == "NULL":
+            return histograms  # An unmigrated database from before latency tracking
+        for row in self.conn.execute("SELECT metric, bucket, count FROM latency_buckets"):
+            histogram = histograms.setdefault(row["metric"], LatencyHistogram())
+            histogram.counts[row["bucket"]] = row["count"]
+        return histograms
+
     def close(self) -> None:
         """Close the database connection."""
         self.conn.close()
@@ -1,5 +1,10 @@
 """Core orchestration logic."""
 
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
 from rich.console import Console
@@ -7,65 +12,113 @@ from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.table import Table
 
-from exrun.adapters import get_adapter
+from exrun.adapters import TestAdapter, get_adapter
+from exrun.cpu import CpuBudget, available_cpus
+from exrun.environments import environment_for, exercise_requirements, is_prepared
 from exrun.exercise import (
     detect_language,
     discover_exercises,
     find_config_file,
     load_course_config,
+    test_runner_for,
 )
-from exrun.models import CourseConfig, Exercise, ExerciseStatus, TestResult
+from exrun.models import CourseConfig, Exercise, ExerciseStatus, TestFailure, TestResult
+from exrun.overlay import exercise_overlay
+from exrun.precheck import check_syntax
 from exrun.progress import ProgressDB
+from exrun.scheduling import expected_duration, longest_first, predicted_total_ms
+from exrun.timeouts import EffectiveTimeout, effective_timeout
+from exrun.tracing import Tracer, span
+
+
+def resolve_course_config(exercises_path: Path | None = None) -> CourseConfig | None:
+    """Find the course configuration for a path, or for the current directory."""
+    if exercises_path:
+        # Direct path provided - look for exrun.toml there
+        config_path = exercises_path / "exrun.toml"
+        if config_path.exists():
+            return load_course_config(config_path)
+        # Create a default config for the path
+        return CourseConfig(
+            name="Unnamed Course",
+            exercises_path=exercises_path.resolve(),
+        )
+
+    config_path = find_config_file()
+    if config_path:
+        return load_course_config(config_path)
+
+    cwd = Path.cwd()
+    # Check for exrun.toml or exercises directory
+    if (cwd / "exrun.toml").exists():
+        return load_course_config(cwd / "exrun.toml")
+    if (cwd / "exercises").exists():
+        return CourseConfig(
+            name="Unnamed Course",
+            exercises_path=cwd / "exercises",
+        )
+    return None
+
+
+@dataclass
+class RunPlan:
+    """An exercise resolved for a run."""
+
+    exercise: Exercise
+    language: str
+    adapter: TestAdapter
+    timeout: EffectiveTimeout
+    # Expected duration, for ordering batch runs
+    estimate_ms: int = 0
 
 
 class ExerciseRunner:
     """Core exercise runner orchestration."""
 
-    def __init__(self, console: Console | None = None):
+    def __init__(self, console: Console | None = None, verbose: bool = False):
         self.console = console or Console()
+        self.verbose = verbose
         self._course_config: CourseConfig | None = None
         self._exercises: list[Exercise] = []
         self._progress_db: ProgressDB | None = None
+        self._adapters: dict[str, TestAdapter] = {}
+        # Collects spans of every run when set (exrun run/watch --trace)
+        self.tracer: Tracer | None = None
+        self.last_trace: Tracer | None = None
+        # Exercises run one at a time here, so each run is allocated every core
+        self.cpu_budget = CpuBudget(1)
 
     def initialize(self, exercises_path: Path | None = None) -> bool:
         """Initialize the runner by finding config and loading exercises."""
-        if exercises_path:
-            # Direct path provided - look for exrun.toml there
-            config_path = exercises_path / "exrun.toml"
-            if config_path.exists():
-                self._course_config = load_course_config(config_path)
-            else:
-                # Create a default config for the path
-                self._course_config = CourseConfig(
-                    name="Unnamed Course",
-                    exercises_path=exercises_path.resolve(),
-                )
-        else:
-            config_path = find_config_file()
-            if config_path:
-                self._course_config = load_course_config(config_path)
-            else:
-                cwd = Path.cwd()
-                # Check for exrun.toml or exercises directory
-                if (cwd / "exrun.toml").exists():
-                    self._course_config = load_course_config(cwd / "exrun.toml")
-                elif (cwd / "exercises").exists():
-                    self._course_config = CourseConfig(
-                        name="Unnamed Course",
-                        exercises_path=cwd / "exercises",
-                    )
-                else:
-                    self.console.print(
-                        "[red]No exrun.toml found and current directory is not an exercise course.[/red]"
-                    )
-                    return False
+        try:
+            self._course_config = resolve_course_config(exercises_path)
+        except ValueError as e:  # including TOML syntax errors
+            self.console.print(f"[red]Invalid configuration: {e}[/red]")
+            return False
+        if self._course_config is None:
+            self.console.print(
+                "[red]No exrun.toml found and current directory is not an exercise course.[/red]"
+            )
+            return False
+
+        # Detection only yields built-in languages or the course's own, so
+        # checking the course language catches every missing adapter up front
+        try:
+            self._adapter_for(self._course_config.language)
+        except LookupError as e:
+            self.console.print(f"[red]{e}[/red]")
+            return False
 
         exercises_path = self._course_config.exercises_path
         if not exercises_path.exists():
             self.console.print(f"[red]Exercises path not found: {exercises_path}[/red]")
             return False
 
-        self._exercises = discover_exercises(exercises_path, self._course_config)
+        try:
+            self._exercises = discover_exercises(exercises_path, self._course_config)
+        except ValueError as e:
+            self.console.print(f"[red]Invalid configuration: {e}[/red]")
+            return False
 
         if not self._exercises:
             self.console.print("[red]No exercises found.[/red]")
@@ -115,19 +168,86 @@ class ExerciseRunner:
 
     def run_exercise(self, exercise: Exercise) -> TestResult:
         """Run tests for a single exercise."""
-        language = detect_language(exercise, self._course_config)
-        adapter = get_adapter(language)
-
-        self.console.print(f"\n[bold]Running tests for: {exercise.name}[/bold]")
-        self.console.print(f"[dim]Using {adapter.name}[/dim]\n")
+        with self._traced_run(exercise, self.cpu_budget) as trace:
+            plan = self.plan_run(exercise)
+            timeout = plan.timeout
+
+            self.console.print(f"\n[bold]Running tests for: {exercise.name}[/bold]")
+            self.console.print(f"[dim]Using {plan.adapter.name}[/dim]")
+            if self.verbose:
+                detail = f" ({timeout.detail})" if timeout.detail else ""
+                self.console.print(
+                    f"[dim]Timeout: {timeout.seconds}s, {timeout.source}{detail}[/dim]"
+                )
+            self.console.print()
 
-        result = adapter.run_tests(exercise, exercise.config.timeout_seconds)
-        self.progress_db.record_attempt(exercise, result)
+            result = self._run_tests(plan)
+            with span("record_attempt"):
+                self.progress_db.record_attempt(exercise, result, plan.language)
 
+        self.last_trace = trace
         return result
 
+    def plan_run(self, exercise: Exercise) -> RunPlan:
+        """Resolve the adapter and timeout for a run of an exercise."""
+        language = self.get_language(exercise)
+        adapter = self._adapter_for(language)
+        with span("timeout"):
+            timeout = self.get_timeout(exercise, adapter.min_timeout_seconds)
+        return RunPlan(exercise, language, adapter, timeout)
+
+    @contextmanager
+    def _traced_run(self, exercise: Exercise, budget: CpuBudget) -> Iterator[Tracer]:
+        """Trace a run holding an allocation from ``budget``. Safe in worker threads."""
+        trace = Tracer()
+        with (
+            trace.activate(),
+            budget.allocate() as cpus,
+            span("run_exercise", exercise=exercise.name, cpus=cpus),
+        ):
+            yield trace
+        if self.tracer:
+            self.tracer.extend(trace)
+
+    def _run_tests(self, plan: RunPlan) -> TestResult:
+        """Run an exercise's tests, unless its sources do not parse."""
+        with span("precheck"):
+            result = check_syntax(plan.exercise)
+        if result is not None:
+            return result
+        return plan.adapter.run_tests(plan.exercise, plan.timeout.seconds)
+
+    def get_language(self, exercise: Exercise) -> str:
+        """Detect the language (adapter key) of an exercise."""
+        with span("detect_language"):
+            return detect_language(exercise, self.course_config)
+
+    def get_adapter(self, exercise: Exercise) -> TestAdapter:
+        """Get the adapter for an exercise, reusing one instance per language."""
+        return self._adapter_for(self.get_language(exercise))
+
+    def _adapter_for(self, language: str) -> TestAdapter:
+        if language not in self._adapters:
+            self._adapters[language] = get_adapter(
+                language, test_runner_for(language, self.course_config)
+            )
+        return self._adapters[language]
+
+    def get_timeout(self, exercise: Exercise, min_timeout_seconds: int = 0) -> EffectiveTimeout:
+        """Get the effective timeout for an exercise from its run history."""
+        durations = self.progress_db.get_recent_durations(exercise, passed_only=True)
+        last_timeout_ms = self.progress_db.get_last_timeout_ms(exercise)
+        return effective_timeout(exercise, durations, min_timeout_seconds, last_timeout_ms)
+
     def display_result(self, exercise: Exercise, result: TestResult) -> None:
         """Display test result with formatting."""
+        if self.tracer:
+            with self.tracer.activate(), span("render", exercise=exercise.name):
+                self._render_result(exercise, result)
+        else:
+            self._render_result(exercise, result)
+
+    def _render_result(self, exercise: Exercise, result: TestResult) -> None:
         if result.passed:
             self.console.print(
                 Panel(
@@ -137,9 +257,13 @@ class ExerciseRunner:
                 )
             )
         else:
+            if result.syntax_error:
+                summary = f"✗ Syntax error in {len(result.failures)} file(s), tests not run"
+            else:
+                summary = f"✗ {len(result.failures)} test(s) failed"
             self.console.print(
                 Panel(
-                    f"[red bold]✗ {len(result.failures)} test(s) failed[/red bold]",
+                    f"[red bold]{summary}[/red bold]",
                     title=f"[red]{exercise.name}[/red]",
                     border_style="red",
                 )
@@ -152,6 +276,33 @@ class ExerciseRunner:
                         msg = failure.message[:200]
                         self.console.print(f"    [dim]{msg}[/dim]")
 
+        if self.verbose:
+            self._display_resource_usage(result)
+            if self.last_trace:
+                self._display_phases(self.last_trace)
+
+    def _display_resource_usage(self, result: TestResult) -> None:
+        """Display wall time and resource accounting for a run."""
+        self.console.print(f"[dim]Wall time: {result.duration_ms} ms[/dim]")
+        usage = result.usage
+        if usage is None:
+            return
+        self.console.print(
+            f"[dim]CPU: {usage.user_cpu_ms} ms user, {usage.sys_cpu_ms} ms sys · "
+            f"Peak RSS: {usage.max_rss_kb / 1024:.1f} MiB · "
+            f"Context switches: {usage.voluntary_switches} voluntary, "
+            f"{usage.involuntary_switches} involuntary[/dim]"
+        )
+
+    def _display_phases(self, trace: Tracer) -> None:
+        """Display where the time of the last run went."""
+        phases = " · ".join(f"{name} {ms:.1f} ms" for name, ms in trace.phase_totals())
+        cpus = next((s.args["cpus"] for s in trace.spans if "cpus" in s.args), None)
+        if phases and cpus:
+            phases += f" · {cpus} CPU(s) allocated"
+        if phases:
+            self.console.print(f"[dim]Phases: {phases}[/dim]")
+
     def display_problem(self, exercise: Exercise) -> None:
         """Display the problem description."""
         self.console.print(f"\n[bold cyan]Exercise: {exercise.name}[/bold cyan]\n")
@@ -219,33 +370,174 @@ class ExerciseRunner:
             return self.get_current_exercise()
         return None
 
-    def verify_all(self) -> bool:
+    def verify_all(self, workers: int | None = None) -> bool:
         """Verify all exercises pass (for course authors)."""
-        all_passed = True
-
-        for exercise in self._exercises:
-            result = self.run_exercise(exercise)
-            if result.passed:
-                self.console.print(f"[green]✓[/green] {exercise.name}")
-            else:
-                self.console.print(f"[red]✗[/red] {exercise.name}")
-                all_passed = False
+        return all(result.passed for _, result in self.run_batch(self._exercises, workers))
+
+    def run_batch(
+        self, exercises: list[Exercise], workers: int | None = None
+    ) -> list[tuple[Exercise, TestResult]]:
+        """Run exercises on a worker pool and record their attempts.
+
+        Runs start longest expected first (the median of recent durations, or
+        the adapter's prior without history) and share the CPUs through a
+        budget. Each run is reported as it finishes, then the actual and
+        predicted total time. Results are returned in course order.
+        """
+        if not exercises:
+            return []
+        workers = workers or available_cpus()
+        # Resolve adapters, timeouts and estimates here; the pool threads only run tests
+        plans = []
+        for exercise in exercises:
+            plan = self.plan_run(exercise)
+            durations = self.progress_db.get_recent_durations(exercise)
+            plan.estimate_ms = expected_duration(durations, plan.adapter.typical_duration_ms).ms
+            plans.append(plan)
+        plans = longest_first(plans, lambda plan: plan.estimate_ms)
+        predicted_ms = predicted_total_ms([plan.estimate_ms for plan in plans], workers)
+        budget = CpuBudget(workers, jobs=len(plans))
+
+        def run(plan: RunPlan) -> TestResult:
+            with self._traced_run(plan.exercise, budget):
+                return self._run_tests(plan)
+
+        results: dict[Path, TestResult] = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run, plan): plan for plan in plans}
+            for future in as_completed(futures):
+                plan = futures[future]
+                result = future.result()
+                # The progress connection belongs to this thread
+                self.progress_db.record_attempt(plan.exercise, result, plan.language)
+                results[plan.exercise.path] = result
+                mark = "[green]✓[/green]" if result.passed else "[red]✗[/red]"
+                self.console.print(f"{mark} {plan.exercise.name}")
+        actual_ms = (time.perf_counter() - start) * 1000
+
+        self.console.print(
+            f"[dim]Total time: {actual_ms / 1000:.1f}s, predicted {predicted_ms / 1000:.1f}s "
+            f"({len(plans)} run(s), {workers} worker(s))[/dim]"
+        )
+        return [(exercise, results[exercise.path]) for exercise in exercises]
+
+    def verify_solutions(self, solutions_dir: Path, workers: int | None = None) -> bool:
+        """Check that each starter fails and each reference solution passes.
+
+        ``solutions_dir`` holds one directory per exercise, at the exercise's
+        path relative to the exercises directory, whose contents replace the
+        exercise's ``src/``. Both states run in parallel in temporary overlays,
+        so neither the working tree nor the progress database is touched.
+        """
+        exercises_path = self.course_config.exercises_path
+        # Resolve adapters and timeouts here; the pool threads only run tests
+        plans = [self.plan_run(exercise) for exercise in self._exercises]
+        solutions: list[Path | None] = []
+        for plan in plans:
+            solution = solutions_dir / plan.exercise.path.relative_to(exercises_path)
+            solutions.append(solution if solution.is_dir() else None)
+
+        workers = workers or available_cpus()
+        runs = len(plans) + sum(1 for solution in solutions if solution)
+        budget = CpuBudget(workers, jobs=runs)
+
+        def run_in_overlay(plan: RunPlan, src_override: Path | None) -> TestResult:
+            with (
+                budget.allocate(),
+                exercise_overlay(plan.exercise, exercises_path, src_override) as overlay,
+            ):
+                return plan.adapter.run_tests(overlay, plan.timeout.seconds)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            starter_runs = [pool.submit(run_in_overlay, plan, None) for plan in plans]
+            solution_runs = [
+                pool.submit(run_in_overlay, plan, solution) if solution else None
+                for plan, solution in zip(plans, solutions)
+            ]
+
+            all_passed = True
+            for plan, starter_run, solution_run in zip(plans, starter_runs, solution_runs):
+                exercise = plan.exercise
+                problems: list[TestFailure] = []
+                if starter_run.result().passed:
+                    problems.append(TestFailure("starter", "Starter code passes the tests"))
+                if solution_run is None:
+                    problems.append(TestFailure("solution", "No reference solution found"))
+                else:
+                    result = solution_run.result()
+                    if not result.passed:
+                        problems.extend(result.failures or [
+                            TestFailure("solution", "Reference solution fails the tests")
+                        ])
+
+                if problems:
+                    all_passed = False
+                    self.console.print(f"[red]✗[/red] {exercise.name}")
+                    for problem in problems[:5]:
+                        self.console.print(f"  [red]✗[/red] {problem.test_name}")
+                        if problem.message:
+                            self.console.print(f"    [dim]{problem.message[:200]}[/dim]")
+                else:
+                    self.console.print(f"[green]✓[/green] {exercise.name}")
 
         return all_passed
 
-    def recheck_completed(self) -> list[tuple[Exercise, TestResult]]:
-        """Re-run all previously passed exercises."""
-        results: list[tuple[Exercise, TestResult]] = []
+    def prepare(self, workers: int | None = None) -> bool:
+        """Build environments and warm caches so first runs start fast.
+
+        Each distinct set of Python requirements is built once, in parallel;
+        sets whose environment already exists are reused as is. Then every
+        exercise's adapter warms its caches (e.g. compiles the tests).
+        """
+        requirement_sets = sorted({
+            exercise_requirements(exercise)
+            for exercise in self._exercises
+            if exercise.config.requirements
+        })
+        ok = True
+        with ThreadPoolExecutor(max_workers=workers or available_cpus()) as pool:
+            reused = {reqs: is_prepared(reqs) for reqs in requirement_sets}
+            futures = {pool.submit(environment_for, reqs): reqs for reqs in requirement_sets}
+            for future in as_completed(futures):
+                reqs = futures[future]
+                label = ", ".join(reqs)
+                try:
+                    env = future.result()
+                except RuntimeError as e:
+                    ok = False
+                    self.console.print(f"[red]✗[/red] {label}\n  [dim]{e}[/dim]")
+                    continue
+                action = "Reused" if reused[reqs] else "Built"
+                self.console.print(f"[green]✓[/green] {action} {env.path.name}: {label}")
+            if not ok:
+                return False
+
+            adapters = [self.get_adapter(exercise) for exercise in self._exercises]
+            problems = pool.map(
+                lambda plan: plan[1].prepare(plan[0]), zip(self._exercises, adapters)
+            )
+            for exercise, problem in zip(self._exercises, problems):
+                # Starters often fail to import until solved, so this is only a warning
+                if problem:
+                    self.console.print(f"[yellow]![/yellow] {exercise.name}: {problem}")
+        self.console.print(f"[green]✓[/green] Warmed caches of {len(self._exercises)} exercise(s)")
+        return True
 
-        for exercise in self._exercises:
-            status = self.progress_db.get_status(exercise)
-            if status == ExerciseStatus.PASSED:
-                result = self.run_exercise(exercise)
-                results.append((exercise, result))
-                if not result.passed:
-                    self.console.print(
-                        f"[red]Regression: {exercise.name} no longer passes![/red]"
-                    )
+    def recheck_completed(self, workers: int | None = None) -> list[tuple[Exercise, TestResult]]:
+        """Re-run all previously passed exercises."""
+        passed = [
+            exercise
+            for exercise in self._exercises
+            if self.progress_db.get_status(exercise) == ExerciseStatus.PASSED
+        ]
+        results = self.run_batch(passed, workers)
+
+        for exercise, result in results:
+            if not result.passed:
+                self.console.print(
+                    f"[red]Regression: {exercise.name} no longer passes![/red]"
+                )
 
         return results
 
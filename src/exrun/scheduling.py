@@ -0,0 +1,41 @@
+"""Longest-first ordering of batch runs from their expected durations.
+
+When runs share a worker pool, a long run started last finishes long after
+the others, setting the batch's total time. Starting the longest runs first
+lets short ones fill in around them (longest processing time first list
+scheduling).
+"""
+
+import heapq
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from exrun.timeouts import percentile
+
+
+@dataclass
+class DurationEstimate:
+    """Expected duration of a run and what it is based on."""
+
+    ms: int
+    source: str  # "history" or "prior"
+
+
+def expected_duration(durations_ms: list[int], prior_ms: int) -> DurationEstimate:
+    """Median of an exercise's recent runs, or the adapter's prior without history."""
+    if durations_ms:
+        return DurationEstimate(percentile(durations_ms, 50), "history")
+    return DurationEstimate(prior_ms, "prior")
+
+
+def longest_first[T](items: Sequence[T], estimate_ms: Callable[[T], int]) -> list[T]:
+    """Order items by decreasing expected duration; ties keep their order."""
+    return sorted(items, key=estimate_ms, reverse=True)
+
+
+def predicted_total_ms(durations_ms: Sequence[int], workers: int) -> int:
+    """Wall time of runs started in this order as pool workers free up."""
+    finish = [0] * max(1, min(workers, len(durations_ms)))
+    for duration in durations_ms:
+        heapq.heappush(finish, heapq.heappop(finish) + duration)
+    return max(finish)
@@ -0,0 +1,65 @@
+"""Per-exercise timeouts derived from historical run durations."""
+
+import math
+from dataclasses import dataclass
+
+from exrun.models import Exercise
+
+
+@dataclass
+class EffectiveTimeout:
+    """The timeout chosen for a run and how it was derived."""
+
+    seconds: int
+    source: str  # "configured", "adaptive" or "backoff"
+    detail: str = ""
+
+
+def percentile(values: list[int], pct: float) -> int:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def effective_timeout(
+    exercise: Exercise,
+    durations_ms: list[int],
+    min_timeout_seconds: int = 0,
+    last_timeout_ms: int | None = None,
+) -> EffectiveTimeout:
+    """Choose the timeout for the next run of an exercise.
+
+    ``durations_ms`` are recent passing runs. With enough of them the
+    timeout is a multiple of their p95 duration, clamped to the policy's
+    floor and ceiling. Otherwise the configured timeout is used. Either way
+    it is raised to the adapter's minimum. ``last_timeout_ms`` is the
+    timeout the latest run hit, if it timed out: the adaptive timeout then
+    backs off to twice that, so a solution slower than the history can
+    still pass.
+    """
+    policy = exercise.config.adaptive_timeout
+    configured = max(exercise.config.timeout_seconds, min_timeout_seconds)
+
+    if not policy.enabled or len(durations_ms) < policy.min_samples:
+        return EffectiveTimeout(seconds=configured, source="configured")
+
+    if last_timeout_ms is not None:
+        doubled = min(math.ceil(last_timeout_ms / 1000 * 2), policy.ceiling_seconds)
+        return EffectiveTimeout(
+            seconds=max(doubled, configured),
+            source="backoff",
+            detail=f"2 × {last_timeout_ms / 1000:.0f}s after the last run timed out",
+        )
+
+    p95_ms = percentile(durations_ms, 95)
+    derived = math.ceil(p95_ms / 1000 * policy.multiplier)
+    seconds = min(max(derived, policy.floor_seconds), policy.ceiling_seconds)
+    return EffectiveTimeout(
+        seconds=max(seconds, min_timeout_seconds),
+        source="adaptive",
+        detail=(
+            f"{policy.multiplier:g} × p95 {p95_ms / 1000:.1f}s over {len(durations_ms)} "
+            "passing runs"
+        ),
+    )
@@ -0,0 +1,54 @@
+"""Resolution of test tool executables.
+
+Adapters launch tools by absolute path with argv lists rather than through a
+shell and ``npx``, which re-resolves the package on every run. Paths are
+looked up once per project root and cached; lookups that find nothing are
+not cached, so a tool installed later (e.g. by ``npm install``) is picked up.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+_resolved: dict[tuple[str, Path | None], list[str]] = {}
+
+
+def _executable(path: Path) -> bool:
+    return path.is_file() and os.access(path, os.X_OK)
+
+
+def node_tool(name: str, project_root: Path) -> list[str]:
+    """Argv prefix running a Node package binary for a project.
+
+    Looks in ``node_modules/.bin`` of the project root and its parents, as
+    npx would, and falls back to ``npx <name>`` when nothing local is found.
+    """
+    root = project_root.resolve()
+    cached = _resolved.get((name, root))
+    if cached is not None:
+        return cached
+    for directory in (root, *root.parents):
+        binary = directory / "node_modules" / ".bin" / name
+        if _executable(binary):
+            _resolved[(name, root)] = [str(binary)]
+            return [str(binary)]
+    return ["npx", name]
+
+
+def python_tool(name: str) -> list[str]:
+    """Argv prefix running a Python tool of the active environment.
+
+    Prefers the tool's script on PATH and falls back to ``python -m <name>``
+    with the interpreter exrun runs under.
+    """
+    cached = _resolved.get((name, None))
+    if cached is not None:
+        return cached
+    script = shutil.which(name)
+    if script is None:
+        return [sys.executable, "-m", name]
+    _resolved[(name, None)] = [script]
+    return [script]
@@ -0,0 +1,107 @@
+"""Timed spans for the phases of a test run.
+
+Code marks phases with ``span("name")``. Spans are only recorded while a
+Tracer is active in the current context (see ``Tracer.activate``), so the
+instrumentation costs next to nothing otherwise. Recorded spans can be
+written as Chrome trace-event JSON, which Perfetto and chrome://tracing open.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+_active: ContextVar[Tracer | None] = ContextVar("exrun_tracer", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    start_us: int
+    duration_us: int = 0
+    depth: int = 0
+    thread_id: int = 0
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """Collects spans, possibly from several threads."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+
+    @contextmanager
+    def activate(self) -> Iterator[Tracer]:
+        """Record spans opened in this context until the block exits."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    @contextmanager
+    def _span(self, name: str, args: dict[str, Any]) -> Iterator[Span]:
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        start = time.perf_counter_ns()
+        record = Span(
+            name, start // 1000, depth=depth, thread_id=threading.get_native_id(), args=args
+        )
+        try:
+            yield record
+        finally:
+            record.duration_us = (time.perf_counter_ns() - start) // 1000
+            self._depth.value = depth
+            with self._lock:
+                self.spans.append(record)
+
+    def extend(self, other: Tracer) -> None:
+        with self._lock:
+            self.spans.extend(other.spans)
+
+    def phase_totals(self) -> list[tuple[str, float]]:
+        """Total milliseconds per phase for spans below the top level, in start order."""
+        totals: dict[str, int] = {}
+        for record in sorted(self.spans, key=lambda s: s.start_us):
+            if record.depth == 1:
+                totals[record.name] = totals.get(record.name, 0) + record.duration_us
+        return [(name, us / 1000) for name, us in totals.items()]
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write spans as Chrome trace-event JSON ("X" complete events)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": record.name,
+                "cat": "exrun",
+                "ph": "X",
+                "ts": record.start_us,
+                "dur": record.duration_us,
+                "pid": pid,
+                "tid": record.thread_id,
+                "args": record.args,
+            }
+            for record in sorted(self.spans, key=lambda s: s.start_us)
+        ]
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[Span | None]:
+    """Time a phase if a tracer is active; otherwise do nothing."""
+    tracer = _active.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer._span(name, args) as record:
+        yield record
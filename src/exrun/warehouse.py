@@ -0,0 +1,203 @@
+"""Warehouse database aggregating many progress databases.
+
+Each source progress.db is tracked with a high-water mark (the id of the
+last attempt imported from it), so ingesting again only copies attempts
+recorded since. Sources whose file has not changed are skipped without
+being opened. Attempt ids are never reused (see the progress schema), so a
+source that has fewer attempts up to its high-water mark than were imported
+had some deleted (its progress was reset) and is re-imported from scratch.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+from exrun.progress import ProgressDB, course_name
+
+_ATTEMPT_COLUMNS = (
+    "exercise",
+    "created_at",
+    "passed",
+    "tests_run",
+    "tests_passed",
+    "failures",
+    "duration_ms",
+    "timed_out",
+    "language",
+    "user_cpu_ms",
+    "sys_cpu_ms",
+    "max_rss_kb",
+    "voluntary_switches",
+    "involuntary_switches",
+)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sources (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        course TEXT NOT NULL,
+        student TEXT NOT NULL,
+        last_attempt_id INTEGER NOT NULL DEFAULT 0,
+        mtime_ns INTEGER,
+        size INTEGER,
+        last_ingested_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS exercises (
+        source_id INTEGER NOT NULL REFERENCES sources(id),
+        course TEXT NOT NULL,
+        student TEXT NOT NULL,
+        name TEXT NOT NULL,
+        order_num TEXT,
+        status TEXT,
+        attempts INTEGER,
+        first_passed_at TIMESTAMP,
+        last_attempt_at TIMESTAMP,
+        PRIMARY KEY (source_id, name)
+    );
+
+    CREATE TABLE IF NOT EXISTS attempts (
+        id INTEGER PRIMARY KEY,
+        source_id INTEGER NOT NULL REFERENCES sources(id),
+        source_attempt_id INTEGER NOT NULL,
+        course TEXT NOT NULL,
+        student TEXT NOT NULL,
+        exercise TEXT NOT NULL,
+        created_at TIMESTAMP,
+        passed BOOLEAN,
+        tests_run INTEGER,
+        tests_passed INTEGER,
+        failures TEXT,
+        duration_ms INTEGER,
+        timed_out BOOLEAN,
+        language TEXT,
+        user_cpu_ms INTEGER,
+        sys_cpu_ms INTEGER,
+        max_rss_kb INTEGER,
+        voluntary_switches INTEGER,
+        involuntary_switches INTEGER,
+        UNIQUE (source_id, source_attempt_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS attempts_course_exercise
+        ON attempts(course, exercise, created_at);
+    CREATE INDEX IF NOT EXISTS attempts_student ON attempts(student, created_at);
+    CREATE INDEX IF NOT EXISTS attempts_created_at ON attempts(created_at);
+    CREATE INDEX IF NOT EXISTS exercises_name ON exercises(course, name);
+    CREATE INDEX IF NOT EXISTS exercises_student ON exercises(student);
+
+    CREATE VIEW IF NOT EXISTS exercise_summary AS
+    SELECT
+        course,
+        name AS exercise,
+        COUNT(*) AS students,
+        SUM(status = 'passed') AS passed,
+        AVG(attempts) AS avg_attempts,
+        MAX(attempts) AS max_attempts
+    FROM exercises
+    GROUP BY course, name;
+"""
+
+
+@dataclass
+class IngestStats:
+    sources: int = 0
+    unchanged: int = 0
+    reset: int = 0
+    attempts: int = 0
+
+
+class Warehouse:
+    """SQLite warehouse of attempts from many students and courses."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def ingest(self, db_paths: list[Path], batch_size: int = 10000) -> IngestStats:
+        """Import attempts recorded since the last ingest of each database."""
+        stats = IngestStats()
+        for db_path in db_paths:
+            stats.sources += 1
+            self._ingest_source(db_path.resolve(), batch_size, stats)
+        return stats
+
+    def _ingest_source(self, db_path: Path, batch_size: int, stats: IngestStats) -> None:
+        stat = db_path.stat()
+        row = self.conn.execute(
+            "SELECT id, last_attempt_id, mtime_ns, size FROM sources WHERE path = ?",
+            (str(db_path),),
+        ).fetchone()
+        if row is not None and (row["mtime_ns"], row["size"]) == (stat.st_mtime_ns, stat.st_size):
+            stats.unchanged += 1
+            return
+
+        course, student = course_name(db_path), db_path.parent.name
+        source = ProgressDB(db_path, read_only=True)
+        try:
+            with self.conn:
+                if row is None:
+                    source_id = self.conn.execute(
+                        "INSERT INTO sources (path, course, student) VALUES (?, ?, ?)",
+                        (str(db_path), course, student),
+                    ).lastrowid
+                    high_water = 0
+                else:
+                    source_id, high_water = row["id"], row["last_attempt_id"]
+                    (imported,) = self.conn.execute(
+                        "SELECT COUNT(*) FROM attempts WHERE source_id = ?", (source_id,)
+                    ).fetchone()
+                    if source.count_attempts(high_water) != imported:
+                        self.conn.execute("DELETE FROM attempts WHERE source_id = ?", (source_id,))
+                        high_water = 0
+                        stats.reset += 1
+
+                placeholders = ", ".join("?" * (len(_ATTEMPT_COLUMNS) + 4))
+                insert = (
+                    "INSERT OR IGNORE INTO attempts (source_id, source_attempt_id, course, "
+                    f"student, {', '.join(_ATTEMPT_COLUMNS)}) VALUES ({placeholders})"
+                )
+                for rows in source.iter_attempts(batch_size=batch_size, after_id=high_water):
+                    self.conn.executemany(
+                        insert,
+                        [
+                            (source_id, r["attempt_id"], course, student,
+                             *(r[column] for column in _ATTEMPT_COLUMNS))
+                            for r in rows
+                        ],
+                    )
+                    high_water = rows[-1]["attempt_id"]
+                    stats.attempts += len(rows)
+
+                # Exercise rows are few and change in place, so replace them wholesale
+                self.conn.execute("DELETE FROM exercises WHERE source_id = ?", (source_id,))
+                self.conn.executemany(
+                    """
+                    INSERT INTO exercises (source_id, course, student, name, order_num,
+                        status, attempts, first_passed_at, last_attempt_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (source_id, course, student, e["name"], e["order_num"], e["status"],
+                         e["attempts"], e["first_passed_at"], e["last_attempt_at"])
+                        for e in source.iter_exercises()
+                    ],
+                )
+                self.conn.execute(
+                    """
+                    UPDATE sources SET course = ?, student = ?, last_attempt_id = ?,
+                        mtime_ns = ?, size = ?, last_ingested_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    """,
+                    (course, student, high_water, stat.st_mtime_ns, stat.st_size, source_id),
+                )
+        finally:
+            source.close()
+
+    def close(self) -> None:
+        self.conn.close()
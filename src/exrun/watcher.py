@@ -2,16 +2,46 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING
 
 from rich.console import Console
 from watchfiles import Change, watch
 
+from exrun.latency import LatencyHistogram, WatchTiming, latency_table
+
 if TYPE_CHECKING:
     from exrun.runner import ExerciseRunner
 
 
+def file_hash(path: str) -> str | None:
+    """SHA-256 of a file's content, or None if it cannot be read."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def latest_mtime(paths: set[str]) -> float | None:
+    """Most recent modification time among files, skipping deleted ones."""
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            pass
+    return max(mtimes, default=None)
+
+
 class ExerciseWatcher:
     """Watch exercise files for changes and trigger test runs."""
 
@@ -22,34 +52,28 @@ class ExerciseWatcher:
     ):
         self.console = console or Console()
         self.debounce_ms = debounce_ms
-        self._stop = False
+        self._stop = threading.Event()
 
     def watch(
         self,
-        exercise_path: Path,
+        watch_path: Path,
         on_change: Callable[[set[tuple[Change, str]]], None],
     ) -> None:
-        """Watch for file changes and call the callback."""
-        watch_path = exercise_path / "src"
-        if not watch_path.exists():
-            watch_path = exercise_path
-
-        self.console.print(f"[dim]Watching {watch_path} for changes...[/dim]")
-        self.console.print("[dim]Press Ctrl+C to stop.[/dim]\n")
-
+        """Watch a directory tree for file changes and call the callback."""
         try:
             for changes in watch(
                 watch_path,
                 debounce=self.debounce_ms,
                 recursive=True,
+                stop_event=self._stop,
             ):
-                if self._stop:
+                if self._stop.is_set():
                     break
 
                 relevant_changes = {
                     (change, path)
                     for change, path in changes
-                    if self._is_relevant_file(path)
+                    if self.is_relevant_file(path)
                 }
 
                 if relevant_changes:
@@ -58,7 +82,7 @@ class ExerciseWatcher:
         except KeyboardInterrupt:
             pass
 
-    def _is_relevant_file(self, path: str) -> bool:
+    def is_relevant_file(self, path: str) -> bool:
         """Check if a file change should trigger a test run."""
         p = Path(path)
 
@@ -78,16 +102,120 @@ class ExerciseWatcher:
 
     def stop(self) -> None:
         """Signal the watcher to stop."""
-        self._stop = True
+        self._stop.set()
+
+
+@dataclass
+class RunTrigger:
+    """A request to rerun tests, from the filesystem watcher or an editor."""
+
+    source: str  # "fs" or "editor"
+    paths: set[str] = field(default_factory=set)
+    received_at: float = field(default_factory=time.time)
+
+
+class SaveDeduplicator:
+    """Recognizes the second notification of a single save.
+
+    Editors report a save over the socket and the filesystem watcher reports
+    the same save shortly afterwards. A notification is a duplicate when every
+    file has the content a run was triggered with less than ``window_seconds``
+    earlier, so saving unchanged content again later (to retry a flaky or
+    timed-out run) still triggers a run.
+    """
+
+    def __init__(self, window_seconds: float = 2.0) -> None:
+        self.window_seconds = window_seconds
+        self._runs: dict[str, tuple[str | None, float]] = {}
+        self._lock = threading.Lock()
+
+    def is_duplicate(self, hashes: dict[str, str | None], at: float) -> bool:
+        """Whether a notification received ``at`` repeats a recently triggered run."""
+        with self._lock:
+            return bool(hashes) and all(
+                path in self._runs
+                and self._runs[path][0] == digest
+                and abs(at - self._runs[path][1]) < self.window_seconds
+                for path, digest in hashes.items()
+            )
+
+    def record(self, hashes: dict[str, str | None], at: float) -> None:
+        """Remember the content a run was triggered with ``at``."""
+        with self._lock:
+            self._runs.update((path, (digest, at)) for path, digest in hashes.items())
+
+
+def _is_editor_message(message: object) -> bool:
+    """Whether a decoded line has the fields of an editor message, all strings."""
+    if not isinstance(message, dict):
+        return False
+    fields = ("event", "path", "hash") if "hash" in message else ("event", "path")
+    if not all(isinstance(message.get(name), str) for name in fields):
+        return False
+    return "\0" not in message["path"]  # Would make resolving the path fail
+
+
+class _EditorRequestHandler(socketserver.StreamRequestHandler):
+    server: EditorListener
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                message = None
+            if _is_editor_message(message):
+                status = self.server.on_message(message)
+            else:
+                status = "error"
+            self.wfile.write(json.dumps({"status": status}).encode() + b"\n")
+
+
+class EditorListener(socketserver.ThreadingUnixStreamServer):
+    """Unix socket accepting save notifications from editor plugins.
+
+    Each line is a JSON object such as::
+
+        {"event": "saved", "path": "/course/exercises/01_hello/src/main.py",
+         "hash": "<sha256 of the saved content>"}
+
+    and is answered with ``{"status": "queued" | "duplicate" | "ignored"}``,
+    or ``{"status": "error"}`` for a line that is not such an object.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, on_message: Callable[[dict[str, str]], str]):
+        self.socket_file = path
+        self.on_message = on_message
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        super().__init__(str(path), _EditorRequestHandler)
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
+        self.socket_file.unlink(missing_ok=True)
 
 
 def run_watch_mode(
     runner: ExerciseRunner,
     keep_going: bool = False,
+    editor_socket: bool = False,
 ) -> None:
-    """Run the exercise runner in watch mode."""
+    """Run the exercise runner in watch mode.
+
+    File changes are picked up by watching the exercises directory. With
+    ``editor_socket`` an editor can also report saves over a Unix socket,
+    which triggers the run without waiting for the debounce.
+    """
     console = runner.console
     watcher = ExerciseWatcher(console)
+    deduplicator = SaveDeduplicator()
+    triggers: queue.Queue[RunTrigger] = queue.Queue()
 
     current = runner.get_current_exercise()
     if not current:
@@ -96,21 +224,100 @@ def run_watch_mode(
 
     runner.display_problem(current)
 
-    def on_change(changes: set[tuple[Change, str]]) -> None:
-        nonlocal current
+    def is_current_file(path: str) -> bool:
+        """Whether a file belongs to the current exercise, its tests included."""
+        return current is not None and Path(path).is_relative_to(current.path)
 
-        if not current:
-            return
+    def on_fs_change(changes: set[tuple[Change, str]]) -> None:
+        triggers.put(RunTrigger("fs", {path for _, path in changes}))
 
-        changed_files = [Path(p).name for _, p in changes]
-        console.print(f"\n[dim]Files changed: {', '.join(changed_files)}[/dim]")
+    def on_editor_message(message: dict[str, str]) -> str:
+        if message.get("event") != "saved":
+            return "ignored"
+        path = str(Path(message["path"]).resolve())
+        if not watcher.is_relevant_file(path) or not is_current_file(path):
+            return "ignored"
+        if "hash" in message and deduplicator.is_duplicate({path: message["hash"]}, time.time()):
+            return "duplicate"
+        triggers.put(RunTrigger("editor", {path}))
+        return "queued"
 
-        result = runner.run_exercise(current)
-        runner.display_result(current, result)
+    listener: EditorListener | None = None
+    if editor_socket:
+        from exrun.daemon import socket_path
 
-        if result.passed:
-            next_exercise = runner.get_current_exercise()
+        try:
+            socket_file = socket_path(runner.course_config.exercises_path.parent, "watch")
+        except RuntimeError as e:
+            console.print(f"[red]{e}; not listening for editor saves.[/red]")
+        else:
+            listener = EditorListener(socket_file, on_editor_message)
+            listener.start()
+            console.print(f"[dim]Listening for editor saves on {socket_file}[/dim]")
+
+    fs_thread = threading.Thread(
+        target=watcher.watch,
+        args=(runner.course_config.exercises_path, on_fs_change),
+        daemon=True,
+    )
+    fs_thread.start()
+    console.print(f"[dim]Watching {current.path} for changes...[/dim]")
+    console.print("[dim]Press Ctrl+C to stop.[/dim]\n")
+
+    def next_batch() -> tuple[set[str], float]:
+        """Wait for a trigger and merge any others queued behind it.
+
+        Returns the changed paths and when the first trigger arrived.
+        """
+        first = triggers.get(timeout=0.5)
+        paths = set(first.paths)
+        while not triggers.empty():
+            paths |= triggers.get_nowait().paths
+        return paths, first.received_at
 
+    session_latency: dict[str, LatencyHistogram] = {}
+
+    def record_latency(timing: WatchTiming) -> None:
+        run_latency: dict[str, LatencyHistogram] = {}
+        for metric, value_ms in timing.durations_ms().items():
+            run_latency.setdefault(metric, LatencyHistogram()).record(value_ms)
+            session_latency.setdefault(metric, LatencyHistogram()).record(value_ms)
+        runner.progress_db.record_latencies(run_latency)
+
+    try:
+        while current and fs_thread.is_alive():
+            try:
+                batch, triggered_at = next_batch()
+            except queue.Empty:
+                continue
+            paths = {p for p in batch if is_current_file(p)}
+            if not paths:
+                continue
+
+            hashes = {path: file_hash(path) for path in paths}
+            if deduplicator.is_duplicate(hashes, triggered_at):
+                continue
+            deduplicator.record(hashes, triggered_at)
+
+            changed_files = [Path(p).name for p in sorted(paths)]
+            console.print(f"\n[dim]Files changed: {', '.join(changed_files)}[/dim]")
+
+            run_started_at = time.time()
+            result = runner.run_exercise(current)
+            run_finished_at = time.time()
+            runner.display_result(current, result)
+            record_latency(WatchTiming(
+                saved_at=min(latest_mtime(paths) or triggered_at, triggered_at),
+                triggered_at=triggered_at,
+                run_started_at=run_started_at,
+                run_finished_at=run_finished_at,
+                rendered_at=time.time(),
+            ))
+
+            if not result.passed:
+                continue
+
+            next_exercise = runner.get_current_exercise()
             if next_exercise and next_exercise != current:
                 if keep_going:
                     current = next_exercise
@@ -126,9 +333,15 @@ def run_watch_mode(
                         pass
             elif not next_exercise:
                 console.print("\n[green bold]🎉 All exercises completed![/green bold]")
-                watcher.stop()
-
-    try:
-        watcher.watch(current.path, on_change)
+                current = None
     except KeyboardInterrupt:
         console.print("\n[dim]Watch mode stopped.[/dim]")
+    finally:
+        watcher.stop()
+        # Let watchfiles return before the interpreter tears down its thread
+        fs_thread.join(timeout=2)
+        if listener:
+            listener.close()
+
+    if session_latency:
+        console.print(latency_table("Save-to-result latency (this session)", session_latency))